@@ -0,0 +1,129 @@
+"""Costo del escapado de html en la serialización.
+
+Compara to_html con escapado (el actual) contra la serialización sin escapar
+que había antes, sobre páginas del corpus, y las variantes de escape para un
+string: replace encadenado (el que se usa), str.translate y html.escape.
+
+    python3 bench/bench_escape.py [--repeat 5]
+"""
+import argparse
+import html
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import htmlnode
+from corpus import generate_page_markdown
+from htmlnode import LeafNode, ParentNode, escape_text
+from node_delimiter import markdown_to_html_node
+from run import best_time
+
+TEXT_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def escape_translate(text):
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.translate(TEXT_TABLE)
+
+
+def escape_stdlib(text):
+    return html.escape(text, quote=False)
+
+
+# La serialización de antes, sin escapar nada
+def raw_leaf_emit_html(self, write):
+    if self.value is None:
+        raise ValueError("Invalid HTML: no value")
+    if self.tag is None:
+        write(self.value)
+        return
+    write(f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>")
+
+
+def raw_parent_emit_html(self, write):
+    if self.tag is None:
+        raise ValueError("Invalid HTML: no tag")
+    if len(self.children) == 0:
+        raise ValueError("Invalid HTML: no children")
+    write(f"<{self.tag}{self.props_to_html()}>")
+    for child in self.children:
+        child.emit_html(write)
+    write(f"</{self.tag}>")
+
+
+def raw_props_to_html(self):
+    if self.props is None:
+        return ""
+    return "".join([f" {prop}=\"{value}\"" for prop, value in self.props.items()])
+
+
+def uncached_props_to_html(props):
+    return "".join([f' {prop}="{htmlnode.escape_attribute(str(value))}"' for prop, value in props.items()])
+
+
+def unescaped(fn):
+    def run():
+        escaped = (LeafNode.emit_html, ParentNode.emit_html)
+        LeafNode.emit_html, ParentNode.emit_html = raw_leaf_emit_html, raw_parent_emit_html
+        LeafNode.props_to_html = ParentNode.props_to_html = raw_props_to_html
+        try:
+            return best_time(fn, repeat=1)
+        finally:
+            LeafNode.emit_html, ParentNode.emit_html = escaped
+            del LeafNode.props_to_html, ParentNode.props_to_html
+    return run
+
+
+def uncached_props(fn):
+    def run():
+        cached = htmlnode.props_to_html
+        htmlnode.props_to_html = uncached_props_to_html
+        try:
+            return best_time(fn, repeat=1)
+        finally:
+            htmlnode.props_to_html = cached
+    return run
+
+
+# Corre las variantes intercaladas, una vez cada una por ronda, y se queda con
+# el mejor tiempo de cada una; así el ruido de la máquina las afecta por igual
+def interleaved(runners, rounds):
+    best = [float("inf")] * len(runners)
+    for _ in range(rounds):
+        for position, runner in enumerate(runners):
+            best[position] = min(best[position], runner())
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'to_html':<22} {'unescaped':>11} {'escaped':>11} {'overhead':>9} {'no props cache':>15}")
+    for shape in ("inline", "huge", "lists"):
+        node = markdown_to_html_node(generate_page_markdown(shape))
+        raw, escaped, uncached = interleaved(
+            [unescaped(node.to_html), lambda: best_time(node.to_html, repeat=1), uncached_props(node.to_html)],
+            args.repeat,
+        )
+        print(f"{shape:<22} {raw * 1000:>9.3f}ms {escaped * 1000:>9.3f}ms {escaped / raw - 1:>9.1%} "
+              f"{uncached * 1000:>13.3f}ms")
+
+    print()
+    print(f"{'escape one string':<22} {'clean':>11} {'special':>11}")
+    clean = "The quick brown fox jumps over the lazy dog, once more"
+    special = "if a < b && c > d then " * 3
+    for name, fn in (("replace (used)", escape_text), ("str.translate", escape_translate), ("html.escape", escape_stdlib)):
+        clean_time, special_time = interleaved(
+            [lambda: best_time(lambda: fn(clean), repeat=1), lambda: best_time(lambda: fn(special), repeat=1)],
+            args.repeat,
+        )
+        print(f"{name:<22} {clean_time * 1e9:>9.1f}ns {special_time * 1e9:>9.1f}ns")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compara el layout con __slots__ de TextNode/LeafNode contra el layout con
+__dict__ que tenían antes: memoria por nodo y tiempo de construcción.
+
+    python3 bench/bench_nodes.py [--count N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode
+from textnode import TextNode, TextType
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+
+def measure(factory, count):
+    start = time.perf_counter()
+    nodes = [factory() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    del nodes
+
+    tracemalloc.start()
+    nodes = [factory() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # la lista que contiene los nodos no cuenta como memoria del nodo
+    size -= sys.getsizeof(nodes)
+    del nodes
+    return size / count, elapsed / count * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("TextNode", lambda: TextNode("text", TextType.BOLD), lambda: DictTextNode("text", TextType.BOLD)),
+        ("LeafNode", lambda: LeafNode("b", "text"), lambda: DictLeafNode("b", "text")),
+    ]
+    print(f"{'node':<10} {'layout':<8} {'bytes/node':>11} {'ns/node':>9}")
+    for name, slotted, with_dict in cases:
+        dict_bytes, dict_ns = measure(with_dict, args.count)
+        slot_bytes, slot_ns = measure(slotted, args.count)
+        print(f"{name:<10} {'__dict__':<8} {dict_bytes:>11.1f} {dict_ns:>9.1f}")
+        print(f"{name:<10} {'slots':<8} {slot_bytes:>11.1f} {slot_ns:>9.1f}")
+        print(f"{name:<10} {'saved':<8} {dict_bytes - slot_bytes:>11.1f} {dict_ns - slot_ns:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
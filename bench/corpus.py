@@ -0,0 +1,107 @@
+"""Genera árboles de contenido markdown sintéticos para los benchmarks.
+
+    python3 bench/corpus.py OUTPUT_DIR [--shape small|huge|inline|lists|mixed] [--pages N] [--seed S]
+"""
+import argparse
+import os
+import random
+
+SHAPES = ("small", "huge", "inline", "lists", "mixed")
+
+WORDS = (
+    "gandalf bilbo frodo shire ring mountain river elves dwarves journey road "
+    "fire shadow light tower forest song king council wizard hobbit dragon"
+).split()
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def inline_sentence(rng):
+    parts = []
+    for _ in range(8):
+        kind = rng.randrange(6)
+        word = rng.choice(WORDS)
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"*{word}*")
+        elif kind == 2:
+            parts.append(f"`{word}`")
+        elif kind == 3:
+            parts.append(f"[{word}](/{rng.choice(WORDS)})")
+        elif kind == 4:
+            parts.append(f"![{word}](/images/{word}.png)")
+        else:
+            parts.append(sentence(rng, 4))
+    return " ".join(parts)
+
+
+def paragraph(rng, lines=3):
+    return "\n".join(sentence(rng) for _ in range(lines))
+
+
+def unordered_list(rng, items):
+    return "\n".join(f"* {sentence(rng, 6)}" for _ in range(items))
+
+
+def ordered_list(rng, items):
+    # block_to_block_type solo reconoce números de un dígito
+    return "\n".join(f"{i + 1}. {sentence(rng, 6)}" for i in range(min(items, 9)))
+
+
+def page(rng, shape, title):
+    blocks = [f"# {title}"]
+    if shape == "small":
+        for _ in range(4):
+            blocks.append(paragraph(rng))
+        blocks.append(unordered_list(rng, 4))
+    elif shape == "huge":
+        for i in range(2000):
+            blocks.append(f"## Section {i}" if i % 50 == 0 else paragraph(rng))
+    elif shape == "inline":
+        for _ in range(40):
+            blocks.append("\n".join(inline_sentence(rng) for _ in range(3)))
+    elif shape == "lists":
+        for _ in range(30):
+            blocks.append(unordered_list(rng, 60))
+            blocks.append(ordered_list(rng, 9))
+    else:
+        blocks.append("> " + sentence(rng))
+        blocks.append(inline_sentence(rng))
+        blocks.append(unordered_list(rng, 8))
+        blocks.append("```\n" + sentence(rng) + "\n```")
+        blocks.append(paragraph(rng))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_page_markdown(shape, seed=0, title="Benchmark page"):
+    return page(random.Random(seed), shape, title)
+
+
+# Escribe `pages` páginas repartidas en secciones de 100, como un sitio real
+def generate_corpus(dest_dir, shape="mixed", pages=100, seed=0):
+    rng = random.Random(seed)
+    for i in range(pages):
+        section = os.path.join(dest_dir, f"section{i // 100}")
+        os.makedirs(section, exist_ok=True)
+        path = os.path.join(section, f"page{i}.md")
+        with open(path, "w") as f:
+            f.write(page(rng, shape, f"Page {i}"))
+    return pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir")
+    parser.add_argument("--shape", choices=SHAPES, default="mixed")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    count = generate_corpus(args.output_dir, args.shape, args.pages, args.seed)
+    print(f"Wrote {count} {args.shape} pages to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
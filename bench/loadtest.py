@@ -0,0 +1,117 @@
+"""Prueba de carga: compara src/serve.py contra python3 -m http.server.
+
+Levanta cada servidor sobre el mismo directorio, abre N clientes concurrentes
+con conexiones keep-alive y pide las mismas URLs durante unos segundos.
+
+    python3 bench/loadtest.py [--root public] [--clients 16] [--seconds 5] [--paths / /index.css]
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def client(port, paths, deadline, headers, counts, index):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    requests = errors = received = 0
+    while time.monotonic() < deadline:
+        path = paths[requests % len(paths)]
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            received += len(response.read())
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        requests += 1
+    connection.close()
+    counts[index] = (requests, errors, received)
+
+
+def run_load(port, paths, clients, seconds, headers):
+    counts = [None] * clients
+    deadline = time.monotonic() + seconds
+    threads = [
+        threading.Thread(target=client, args=(port, paths, deadline, headers, counts, i))
+        for i in range(clients)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    requests = sum(count[0] for count in counts)
+    errors = sum(count[1] for count in counts)
+    received = sum(count[2] for count in counts)
+    return requests / elapsed, errors, received / elapsed
+
+
+def benchmark(name, command, port, args):
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT_DIR)
+    try:
+        wait_for_port(port)
+        headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+        rate, errors, throughput = run_load(port, args.paths, args.clients, args.seconds, headers)
+    finally:
+        process.terminate()
+        process.wait()
+    print(f"{name:<12} {rate:>10.0f} req/s {throughput / 1e6:>10.1f} MB/s {errors:>8} errors")
+    return rate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="public")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--gzip", action="store_true", help="send Accept-Encoding: gzip")
+    parser.add_argument("--paths", nargs="+", default=["/", "/index.css", "/majesty/", "/images/rivendell.png"])
+    args = parser.parse_args(argv)
+
+    root = os.path.join(ROOT_DIR, args.root)
+    port = free_port()
+    baseline = benchmark(
+        "http.server",
+        [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1", "--directory", root],
+        port,
+        args,
+    )
+    port = free_port()
+    ours = benchmark(
+        "serve.py",
+        [sys.executable, os.path.join(ROOT_DIR, "src", "serve.py"), "--root", root, "--port", str(port)],
+        port,
+        args,
+    )
+    print(f"serve.py is {ours / baseline:.1f}x http.server")
+
+
+if __name__ == "__main__":
+    main()
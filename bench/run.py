@@ -0,0 +1,169 @@
+"""Suite de benchmarks del generador.
+
+Corre microbenchmarks de las funciones del parser y un build completo de main()
+sobre un corpus sintético, guarda los resultados en JSON y, si se pasa una
+línea base, falla cuando algún benchmark es más lento que el umbral. Los
+benchmarks sin valor en la línea base (p.ej. el build chico de --quick contra
+una base guardada sin --quick) se listan aparte en vez de ignorarse.
+
+    python3 bench/run.py [--output bench_results.json] [--baseline bench/baseline.json]
+                         [--threshold 0.25] [--quick] [--save-baseline]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import main as site
+from corpus import generate_corpus, generate_page_markdown
+from node_delimiter import block_to_block_type, markdown_to_blocks, markdown_to_html_node, markdown_to_typed_blocks, text_to_textnodes
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+# Mejor tiempo por llamada de `repeat` corridas; cada corrida ejecuta fn
+# suficientes veces para durar al menos min_time (como timeit.autorange)
+def best_time(fn, repeat=5, min_time=0.02):
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _best_time(fn, repeat, min_time)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _best_time(fn, repeat, min_time):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def micro_benchmarks(repeat):
+    results = {}
+    for shape in ("huge", "inline", "lists"):
+        markdown = generate_page_markdown(shape)
+        blocks = markdown_to_blocks(markdown)
+        texts = [" ".join(block.split("\n")) for block in blocks]
+        node = markdown_to_html_node(markdown)
+
+        results[f"markdown_to_blocks[{shape}]"] = best_time(lambda: markdown_to_blocks(markdown), repeat=repeat)
+        results[f"block_to_block_type[{shape}]"] = best_time(
+            lambda: [block_to_block_type(block) for block in blocks], repeat=repeat)
+        results[f"split_and_classify[{shape}]"] = best_time(
+            lambda: [block_to_block_type(block) for block in markdown_to_blocks(markdown)], repeat=repeat)
+        results[f"markdown_to_typed_blocks[{shape}]"] = best_time(
+            lambda: markdown_to_typed_blocks(markdown), repeat=repeat)
+        if shape != "lists":
+            results[f"text_to_textnodes[{shape}]"] = best_time(
+                lambda: [text_to_textnodes(text) for text in texts], repeat=repeat)
+        results[f"to_html[{shape}]"] = best_time(node.to_html, repeat=repeat)
+    return results
+
+
+def build_benchmark(pages, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_corpus(os.path.join(tmp, "content"), "mixed", pages)
+        shutil.copytree(os.path.join(ROOT_DIR, "static"), os.path.join(tmp, "static"))
+        shutil.copy(os.path.join(ROOT_DIR, "template.html"), os.path.join(tmp, "template.html"))
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                # sin caches: cada corrida parsea y renderiza todo, como un
+                # build en frío; con caches, las corridas después de la
+                # primera solo miden lo que no cubren
+                results[f"build[{pages} pages]"] = best_time(
+                    lambda: site.main(["--no-parse-cache", "--no-block-cache"]), repeat, min_time=0)
+                results[f"build_warm_cache[{pages} pages]"] = best_time(lambda: site.main([]), repeat, min_time=0)
+                results[f"build_incremental_noop[{pages} pages]"] = best_time(
+                    lambda: site.main(["--incremental"]), repeat, min_time=0)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+# Devuelve los benchmarks que empeoraron más que threshold respecto a la base
+# y los que no se pudieron comparar porque la base no los tiene
+def compare(results, baseline, threshold):
+    regressions = []
+    unmatched = []
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None or base == 0:
+            unmatched.append(name)
+            continue
+        change = seconds / base - 1
+        if change > threshold:
+            regressions.append((name, base, seconds, change))
+    return regressions, unmatched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--pages", type=int, default=500, help="pages in the end-to-end build corpus")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and a smaller build")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    repeat = 2 if args.quick else 5
+    pages = min(args.pages, 50) if args.quick else args.pages
+    results = micro_benchmarks(repeat)
+    results.update(build_benchmark(pages, 1 if args.quick else 3))
+
+    for name, seconds in sorted(results.items()):
+        print(f"{name:<40} {seconds * 1000:>10.3f} ms")
+
+    report = {"python": platform.python_version(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions, unmatched = compare(results, baseline, args.threshold)
+    for name in unmatched:
+        print(f"NOT COMPARED {name}: no value in {args.baseline}")
+    for name, base, seconds, change in regressions:
+        print(f"REGRESSION {name}: {base * 1000:.3f} ms -> {seconds * 1000:.3f} ms (+{change:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+# Cache LRU de bloques ya renderizados: bloque markdown normalizado -> html.
+# Guarda solo strings (inmutables); cada página construye sus propios nodos a
+# partir del html, así que nunca se comparten nodos entre páginas
+class BlockCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=None, enabled=True):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, block):
+        with self._lock:
+            html = self._entries.get(block)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(block)
+            self.hits += 1
+            return html
+
+    def put(self, block, html):
+        size = _entry_size(block, html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(block, None)
+            if previous is not None:
+                self.bytes -= _entry_size(block, previous)
+            self._entries[block] = html
+            self.bytes += size
+            while self.bytes > self.max_bytes or (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                old_block, old_html = self._entries.popitem(last=False)
+                self.bytes -= _entry_size(old_block, old_html)
+                self.evictions += 1
+
+    # Suma lo que contó la cache de otro proceso (un worker de un pool)
+    def add_stats(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"BlockCache(entries={len(self._entries)}, bytes={self.bytes}, "
+                f"hits={self.hits}, misses={self.misses}, evictions={self.evictions})")
+
+
+# aproximación: los strings de CPython usan 1 byte por carácter ASCII
+def _entry_size(block, html):
+    return len(block) + len(html)
+
+
+# cache compartida por todas las páginas de un build (una por proceso)
+default_block_cache = BlockCache()
+
+
+# Inicializador de los pools de render: con spawn/forkserver cada worker vuelve
+# a importar este módulo y su cache arrancaría habilitada
+def init_worker_cache(enabled):
+    default_block_cache.enabled = enabled
+
+
+# Llama a function en un worker y devuelve (resultado, (hits, misses)) con lo
+# que contó la cache del proceso durante esa llamada, para sumarlo en el padre
+def counted(function, *args):
+    hits, misses = default_block_cache.hits, default_block_cache.misses
+    result = function(*args)
+    return result, (default_block_cache.hits - hits, default_block_cache.misses - misses)
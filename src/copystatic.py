@@ -1,15 +1,155 @@
+import errno
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
+COPY_CHUNK = 1 << 30
+# errores que indican que la copia en el kernel no se puede usar para este par
+# de archivos (otro filesystem, syscall no soportada...) y hay que caer al
+# siguiente método
+FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+
+class SyncSummary:
+    def __init__(self):
+        self.copied = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.bytes = 0
+
+    def __eq__(self, other):
+        if isinstance(other, SyncSummary):
+            return (self.copied, self.skipped, self.deleted, self.bytes) == (
+                other.copied, other.skipped, other.deleted, other.bytes)
+        return False
+
+    def __repr__(self):
+        return f"SyncSummary(copied={self.copied}, skipped={self.skipped}, deleted={self.deleted}, bytes={self.bytes})"
+
+
+# Sincroniza source_dir_path en dest_dir_path: solo copia los archivos cuyo
+# tamaño o mtime cambiaron, y con delete=True borra del destino lo que ya no
+# existe en el origen. only(fuente) limita la sincronización a esos archivos
+def copy_files_recursive(source_dir_path, dest_dir_path, manifest=None, workers=4, hardlink=False, delete=False, only=None):
+    summary = SyncSummary()
+    jobs = []
+    expected = set()
+    _plan_sync(source_dir_path, dest_dir_path, jobs, expected, summary, manifest, only)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        sizes = executor.map(lambda job: _copy_file(job[0], job[1], hardlink), jobs)
+        for (from_path, dest_path), size in zip(jobs, sizes):
+            summary.copied += 1
+            summary.bytes += size
+            if manifest is not None:
+                manifest.record(from_path, dest_path, stamp=_stamp(os.stat(from_path)))
+
+    if delete:
+        summary.deleted = _delete_extra(dest_dir_path, expected)
+    return summary
+
+
+def _plan_sync(source_dir_path, dest_dir_path, jobs, expected, summary, manifest, only=None):
     if not os.path.exists(dest_dir_path):
         os.mkdir(dest_dir_path)
+    expected.add(os.path.normpath(dest_dir_path))
+
+    for entry in sorted(os.scandir(source_dir_path), key=lambda entry: entry.name):
+        dest_path = os.path.join(dest_dir_path, entry.name)
+        expected.add(os.path.normpath(dest_path))
+        if entry.is_dir():
+            _plan_sync(entry.path, dest_path, jobs, expected, summary, manifest, only)
+            continue
+        if only is not None and not only(entry.path):
+            continue
+        source_stat = entry.stat()
+        if _is_synced(source_stat, dest_path):
+            summary.skipped += 1
+            if manifest is not None:
+                manifest.record(entry.path, dest_path, stamp=_stamp(source_stat), built=False)
+            continue
+        jobs.append((entry.path, dest_path))
+
+
+def _stamp(stat):
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _is_synced(source_stat, dest_path):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if (dest_stat.st_dev, dest_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+        return True
+    return dest_stat.st_size == source_stat.st_size and dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def _copy_file(from_path, dest_path, hardlink=False):
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if hardlink:
+        try:
+            os.link(from_path, dest_path)
+            return os.stat(from_path).st_size
+        except OSError:
+            pass
+    with open(from_path, "rb") as src, open(dest_path, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        _kernel_copy(src, dst, size)
+    shutil.copystat(from_path, dest_path)
+    return size
+
+
+# copy_file_range y sendfile copian dentro del kernel, sin pasar los datos por
+# buffers de Python; si ninguno está disponible se usa copyfileobj
+def _kernel_copy(src, dst, size):
+    for copy in (_copy_file_range, _sendfile):
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        try:
+            copy(src.fileno(), dst.fileno(), size)
+            return
+        except OSError as e:
+            if e.errno not in FALLBACK_ERRNOS:
+                raise
+    src.seek(0)
+    dst.seek(0)
+    dst.truncate()
+    shutil.copyfileobj(src, dst)
+
+
+def _copy_file_range(src_fd, dst_fd, size):
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range not available")
+    remaining = size
+    while remaining > 0:
+        copied = os.copy_file_range(src_fd, dst_fd, min(remaining, COPY_CHUNK))
+        if copied == 0:
+            break
+        remaining -= copied
+
+
+def _sendfile(src_fd, dst_fd, size):
+    if not hasattr(os, "sendfile"):
+        raise OSError(errno.ENOSYS, "sendfile not available")
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, min(size - offset, COPY_CHUNK))
+        if sent == 0:
+            break
+        offset += sent
+
 
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {dest_path}")
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
-        else:
-            copy_files_recursive(from_path, dest_path)
\ No newline at end of file
+def _delete_extra(dest_dir_path, expected):
+    deleted = 0
+    for dirpath, dirnames, filenames in os.walk(dest_dir_path, topdown=False):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.normpath(path) not in expected:
+                os.remove(path)
+                deleted += 1
+        if os.path.normpath(dirpath) not in expected and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return deleted
@@ -0,0 +1,123 @@
+"""Daemon de build: mantiene el manifest, las caches y el template en memoria y
+reconstruye cuando recibe un comando por un socket Unix.
+
+    python3 src/daemon.py start [opciones de main.py]   # p.ej. --precompress
+    python3 src/daemon.py rebuild all
+    python3 src/daemon.py rebuild content/index.md static/index.css
+    python3 src/daemon.py status
+    python3 src/daemon.py stop
+
+El protocolo es una línea de texto por comando; la respuesta es la salida del
+build seguida de una línea "ok ..." o "error ...". El cliente solo importa
+módulos de la stdlib para arrancar rápido.
+"""
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = "./.build.sock"
+
+
+def serve(socket_path, build_argv):
+    import contextlib
+    import io
+    import time
+
+    import main as site
+    from manifest import BuildManifest
+
+    args = site.parse_args(build_argv + ["--incremental"])
+    try:
+        manifest = site.build(args)
+    except Exception as e:
+        # igual que en un rebuild: se reporta y el daemon sigue atendiendo
+        print(f" ! initial build failed: {e}")
+        manifest = BuildManifest.load(site.manifest_path)
+    root = os.getcwd()
+
+    def run(command):
+        parts = command.split()
+        if not parts:
+            raise ValueError("empty command")
+        if parts[0] == "status":
+            return f"{len(manifest.entries)} tracked files"
+        if parts[0] != "rebuild" or len(parts) < 2:
+            raise ValueError(f"unknown command: {command}")
+        start = time.perf_counter()
+        if parts[1:] == ["all"]:
+            manifest.reset()
+            site.run_build(args, manifest)
+        else:
+            changed = [os.path.normpath(os.path.relpath(os.path.abspath(path), root)) for path in parts[1:]]
+            site.rebuild_changed(changed, manifest, args)
+        return f"rebuilt {manifest.built} files in {(time.perf_counter() - start) * 1000:.1f} ms"
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    print(f"Build daemon listening on {socket_path}")
+    try:
+        while True:
+            connection, _ = server.accept()
+            # un cliente que se desconecta a mitad no debe tumbar el daemon
+            with contextlib.suppress(OSError), connection, connection.makefile("rw") as stream:
+                command = stream.readline().strip()
+                if command == "stop":
+                    stream.write("ok stopping\n")
+                    break
+                output = io.StringIO()
+                try:
+                    with contextlib.redirect_stdout(output):
+                        result = f"ok {run(command)}"
+                except Exception as e:
+                    result = f"error {e}"
+                stream.write(output.getvalue())
+                stream.write(result + "\n")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def send(socket_path, command):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError as e:
+        print(f"error: no build daemon on {socket_path} ({e.strerror})", file=sys.stderr)
+        return 2
+    with client, client.makefile("rw") as stream:
+        stream.write(command + "\n")
+        stream.flush()
+        last = ""
+        for line in stream:
+            sys.stdout.write(line)
+            last = line
+    return 0 if last.startswith("ok") else 1
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    socket_path = os.environ.get("BUILD_SOCKET", DEFAULT_SOCKET_PATH)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__)
+        return 0
+    if argv[0] == "start":
+        serve(socket_path, argv[1:])
+        return 0
+    if argv[0] == "rebuild" and argv[1:] != ["all"]:
+        # el daemon puede tener otro cwd: se mandan rutas absolutas
+        argv = argv[:1] + [os.path.abspath(path) for path in argv[1:]]
+    if argv[0] in ("rebuild", "status", "stop"):
+        return send(socket_path, " ".join(argv))
+    print(f"error: unknown command {argv[0]}", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,292 @@
+import hashlib
+import json
 import os
-from node_delimiter import markdown_to_html_node
-from pathlib import Path
-from htmlnode import ParentNode
+from concurrent.futures import ProcessPoolExecutor
+from node_delimiter import StreamingMarkdown, block_to_html_node, markdown_to_html_node, markdown_to_typed_blocks
+from pathlib import Path, PurePosixPath
+from htmlnode import LeafNode, ParentNode, escape_attribute
+from template import compile_template, load_template
+from instrument import PageTrace
+from blockcache import counted, default_block_cache, init_worker_cache
+from metadata import body_lines, find_title, scan_lines, split_front_matter
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    for filename in os.listdir(dir_path_content):
+# Las páginas más grandes que esto se renderizan en streaming, bloque a bloque
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+
+class PageBuildError(Exception):
+    def __init__(self, from_path, error):
+        super().__init__(f"{from_path}: {error}")
+        self.from_path = from_path
+        self.error = error
+
+
+def page_dest_path(from_path, dir_path_content, dest_dir_path):
+    relative_path = os.path.relpath(from_path, dir_path_content)
+    return Path(os.path.join(dest_dir_path, relative_path)).with_suffix(".html")
+
+
+# Solo los .md de content son páginas; el resto (swap de editores, notas,
+# imágenes) se ignora
+def is_page(path):
+    return str(path).endswith(".md")
+
+
+def collect_pages(dir_path_content, dest_dir_path, only=None):
+    return list(iter_pages(dir_path_content, dest_dir_path, only))
+
+
+# Como collect_pages pero de a una página, en el mismo orden; en memoria solo
+# queda el listado de los directorios que se están recorriendo. only(fuente)
+# decide qué páginas entran
+def iter_pages(dir_path_content, dest_dir_path, only=None):
+    for filename in sorted(os.listdir(dir_path_content)):
         from_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename)
         if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path)
+            if is_page(from_path) and (only is None or only(from_path)):
+                yield from_path, Path(dest_path).with_suffix(".html")
         else:
-            generate_pages_recursive(from_path, template_path, dest_path)
+            yield from iter_pages(from_path, dest_path, only)
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, manifest=None, workers=1, tracer=None, parse_cache=None, only=None):
+    pages = collect_pages(dir_path_content, dest_dir_path, only)
+    generate_pages(pages, template_path, manifest, workers, tracer, parse_cache)
+
+
+def generate_pages(pages, template_path, manifest=None, workers=1, tracer=None, parse_cache=None):
+    if manifest is not None:
+        pages = [
+            (from_path, dest_path)
+            for from_path, dest_path in pages
+            if not manifest.is_fresh(from_path, dest_path, template_path)
+        ]
+    if not pages:
+        return
+    template = load_template(template_path)
+    trace_mode = _trace_mode(tracer)
+    if workers == 1 or len(pages) < 2:
+        results = (
+            _render_page(from_path, template, dest_path, trace_mode, parse_cache)
+            for from_path, dest_path in pages
+        )
+        _report_pages(pages, results, template_path, manifest, tracer)
+    else:
+        generate_pages_parallel(pages, template, template_path, manifest, workers, tracer, parse_cache)
+
+
+# Renderiza las paginas en un pool de procesos; los resultados se reportan en el
+# orden de la lista para que la salida sea la misma que en serie
+def generate_pages_parallel(pages, template, template_path, manifest=None, workers=None, tracer=None, parse_cache=None):
+    chunksize = max(1, len(pages) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_cache,
+                             initargs=(default_block_cache.enabled,)) as executor:
+        results = executor.map(
+            _render_page_in_worker,
+            [from_path for from_path, _ in pages],
+            [template] * len(pages),
+            [dest_path for _, dest_path in pages],
+            [_trace_mode(tracer)] * len(pages),
+            [parse_cache] * len(pages),
+            chunksize=chunksize,
+        )
+        _report_pages(pages, _add_worker_stats(results), template_path, manifest, tracer)
+
+
+def _render_page_in_worker(*args):
+    return counted(_render_page, *args)
+
+
+# Las estadísticas de la cache de bloques de los workers se suman a las del
+# proceso principal, que son las que se reportan
+def _add_worker_stats(results):
+    for result, (hits, misses) in results:
+        default_block_cache.add_stats(hits, misses)
+        yield result
+
+
+def _trace_mode(tracer):
+    if tracer is None:
+        return None
+    return "memory" if tracer.memory else "time"
+
 
+# Todas las paginas se intentan; si alguna falla se lanza la primera al final
+def _report_pages(pages, results, template_path, manifest, tracer=None):
+    failures = []
+    for (from_path, dest_path), (error, page_trace) in zip(pages, results):
+        print(f" * {from_path} with {template_path} -> {dest_path}")
+        if page_trace is not None and tracer is not None:
+            tracer.add_page(page_trace)
+        if error is not None:
+            failures.append(PageBuildError(from_path, error))
+        elif manifest is not None:
+            manifest.record(from_path, dest_path, template_path)
+    if failures:
+        for failure in failures[1:]:
+            print(f" ! {failure}")
+        raise failures[0] from failures[0].error
+
+
+def _render_page(from_path, template, dest_path, trace_mode=None, parse_cache=None):
+    page_trace = None
+    if trace_mode is not None:
+        page_trace = PageTrace(from_path, memory=trace_mode == "memory")
+    try:
+        if page_trace is None:
+            write_page(from_path, template, dest_path, parse_cache)
+        else:
+            write_page_traced(from_path, template, dest_path, page_trace)
+    except Exception as e:
+        return e, page_trace
+    return None, page_trace
 
 
 def generate_page(from_path, template_path, dest_path):
     print(f" * {from_path} with {template_path} -> {dest_path}")
+    write_page(from_path, load_template(template_path), dest_path)
+
+
+def write_page(from_path, template, dest_path, parse_cache=None):
+    if os.path.getsize(from_path) > STREAMING_THRESHOLD:
+        write_page_streaming(from_path, template, dest_path)
+        return
+
+    with open(from_path, "r") as from_file:
+        markdown_content = from_file.read()
+
+    title, content = render_page_body(markdown_content, parse_cache)
+
+    dest_dir_path = os.path.dirname(dest_path)
+    if dest_dir_path != "":
+        os.makedirs(dest_dir_path, exist_ok=True)
+    with open(dest_path, "w") as to_file:
+        template.write(to_file, page_values(title, content))
 
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
 
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
+# Los valores de los huecos del template para una página. El título es texto
+# plano (del heading o del front matter) y el template lo puede usar tanto en
+# <title> como dentro de un atributo, así que se escapa como atributo
+def page_values(title, content):
+    return {"Title": escape_attribute(title), "Content": content}
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
 
-    title = extract_title(markdown_content)
+# Devuelve (título, contenido). Sin cache en disco el contenido es el nodo, que
+# se serializa en streaming al escribir; con cache es el html ya serializado
+def render_page_body(markdown_content, parse_cache=None, block_cache=default_block_cache):
+    if parse_cache is None:
+        return _parse_page(markdown_content, block_cache)
+    # con cache en disco solo se parsea el markdown si cambió
+    cached = parse_cache.get(markdown_content)
+    if cached is not None:
+        return cached
+    title, content = _parse_page(markdown_content, block_cache)
+    content = content.to_html()
+    parse_cache.put(markdown_content, title, content)
+    return title, content
 
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
+
+# El título del front matter, si lo hay, reemplaza al primer heading
+def _parse_page(markdown_content, block_cache):
+    meta, body = split_front_matter(markdown_content)
+    title = meta.get("title") or extract_title(body)
+    return title, markdown_to_html_node(body, block_cache)
+
+
+# Renderiza un sitio completo en memoria, sin tocar el disco: recibe
+# {"blog/post.md": markdown} y el texto del template y devuelve
+# {"blog/post.html": html}. Es thread-safe: el template compilado se reutiliza
+# entre llamadas y la cache de bloques tiene su propio lock
+def build_site(pages, template, block_cache=default_block_cache):
+    compiled = compile_template(template)
+    site = {}
+    for path in sorted(pages):
+        try:
+            title, content = render_page_body(pages[path], block_cache=block_cache)
+            html = compiled.render(page_values(title, content.to_html()))
+        except Exception as e:
+            raise PageBuildError(path, e) from e
+        site[PurePosixPath(path).with_suffix(".html").as_posix()] = html
+    return site
+
+
+# Escribe las páginas de listado de metadata.listings; solo usan títulos y
+# urls, así que no hace falta renderizar ninguna página para generarlas
+def generate_listings(listing_pages, template_path, manifest=None):
+    template = None
+    for dest_path, (title, items) in sorted(listing_pages.items()):
+        source = f"listing:{dest_path}"
+        stamp = hashlib.sha256(json.dumps([title, items]).encode()).hexdigest()
+        if manifest is not None and manifest.is_fresh(source, dest_path, template_path, stamp):
+            continue
+        if template is None:
+            template = load_template(template_path)
+        print(f" * listing with {template_path} -> {dest_path}")
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w") as to_file:
+            template.write(to_file, page_values(title, listing_to_html_node(items)))
+        if manifest is not None:
+            manifest.record(source, dest_path, template_path, stamp)
+
+
+def listing_to_html_node(items):
+    links = [ParentNode("li", [LeafNode("a", title, {"href": url})]) for title, url in items]
+    return ParentNode("div", [ParentNode("ul", links)])
+
+
+# Para archivos enormes: el título se busca leyendo solo hasta el primer
+# heading y el cuerpo se lee, renderiza y escribe bloque a bloque, así la
+# memoria depende del bloque más grande y no del archivo (por eso tampoco usa
+# la cache de bloques). Se escribe a un temporal para no dejar una página a
+# medias si falla
+def write_page_streaming(from_path, template, dest_path):
+    with open(from_path, "r") as from_file:
+        title, _ = scan_lines(from_file)
+    if title is None:
+        raise ValueError("No title found")
 
     dest_dir_path = os.path.dirname(dest_path)
     if dest_dir_path != "":
         os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(from_path, "r") as from_file, open(tmp_path, "w") as to_file:
+            content = StreamingMarkdown(body_lines(from_file))
+            template.write(to_file, page_values(title, content))
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Igual que write_page pero midiendo cada fase por separado; por eso no usa
+# la serialización en streaming
+def write_page_traced(from_path, template, dest_path, trace):
+    with trace.phase("read"):
+        with open(from_path, "r") as from_file:
+            markdown_content = from_file.read()
+    with trace.phase("block parse"):
+        meta, body = split_front_matter(markdown_content)
+        typed_blocks = markdown_to_typed_blocks(body)
+    with trace.phase("inline parse"):
+        children = [block_to_html_node(block, block_type) for block, block_type in typed_blocks]
+        node = ParentNode("div", children, None)
+        title = meta.get("title") or extract_title(body)
+    with trace.phase("to_html"):
+        html = node.to_html()
+    with trace.phase("template fill"):
+        page = template.render(page_values(title, html))
+    with trace.phase("write"):
+        dest_dir_path = os.path.dirname(dest_path)
+        if dest_dir_path != "":
+            os.makedirs(dest_dir_path, exist_ok=True)
+        with open(dest_path, "w") as to_file:
+            to_file.write(page)
 
 
+# Busca el primer heading sin partir el documento en líneas
 def extract_title(md):
-    lines = md.split("\n")
-    for line in lines:
-        if line.startswith("# "):
-            return line[2:]
-    raise ValueError("No title found")
\ No newline at end of file
+    title = find_title(md)
+    if title is None:
+        raise ValueError("No title found")
+    return title
\ No newline at end of file
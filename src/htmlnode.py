@@ -1,6 +1,42 @@
 
+PROPS_CACHE_SIZE = 4096
+
+_props_cache = {}
+
+
+# Escapa texto para el cuerpo de un elemento. La mayoría de los textos no
+# tienen caracteres especiales y se devuelven sin copiar; con replace
+# encadenado es más rápido que str.translate (ver bench/bench_escape.py)
+def escape_text(text):
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value):
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+# Los mismos props se repiten mucho (el mismo href en todas las páginas), así
+# que el string serializado se guarda por contenido del dict
+def props_to_html(props):
+    # la clave usa los valores ya pasados a str, que es lo que se serializa:
+    # sirve para valores no hashables (listas) y no confunde True con 1
+    key = tuple([(prop, str(value)) for prop, value in props.items()])
+    html = _props_cache.get(key)
+    if html is None:
+        html = "".join([f' {prop}="{escape_attribute(value)}"' for prop, value in key])
+        if len(_props_cache) >= PROPS_CACHE_SIZE:
+            _props_cache.clear()
+        _props_cache[key] = html
+    return html
+
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self,tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,15 +44,21 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        chunks = []
+        self.emit_html(chunks.append)
+        return "".join(chunks)
+
+    # Escribe el html directamente en un archivo o buffer, sin copias intermedias
+    def write_html(self, fp):
+        self.emit_html(fp.write)
+
+    def emit_html(self, write):
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self):
-        if self.props is None:
+        if not self.props:
             return ""
-        html_string = ""
-        for prop in self.props:
-            html_string += f" {prop}=\"{self.props[prop]}\""
-        return html_string
+        return props_to_html(self.props)
             
     def __repr__(self):
         return f"HTMLNode({self.tag= },\n {self.value= },\n {self.children= },\n {self.props= })"
@@ -25,36 +67,61 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def emit_html(self, write):
         if self.value is None:
             raise ValueError("Invalid HTML: no value")
+        value = self.value
+        # el chequeo va en línea: la mayoría de las hojas no tienen nada que
+        # escapar y así no pagan la llamada a escape_text
+        if "&" in value or "<" in value or ">" in value:
+            value = escape_text(value)
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            write(value)
+        elif self.props:
+            write(f"<{self.tag}{props_to_html(self.props)}>{value}</{self.tag}>")
+        else:
+            write(f"<{self.tag}>{value}</{self.tag}>")
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props = None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def emit_html(self, write):
         if self.tag is None:
             raise ValueError("Invalid HTML: no tag")
         if len(self.children) == 0:
             raise ValueError("Invalid HTML: no children")    
-        children_html = ""
+        if self.props:
+            write(f"<{self.tag}{props_to_html(self.props)}>")
+        else:
+            write(f"<{self.tag}>")
         for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+            child.emit_html(write)
+        write(f"</{self.tag}>")
 
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
 
 
-    
-    
+# Html ya serializado (p.ej. un bloque de la cache); se escribe tal cual
+class RawHTML(HTMLNode):
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html)
+
+    def emit_html(self, write):
+        write(self.value)
+
+    def __repr__(self):
+        return f"RawHTML({self.value})"
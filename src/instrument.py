@@ -0,0 +1,129 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+PAGE_PHASES = ("read", "block parse", "inline parse", "to_html", "template fill", "write")
+PHASE_LABELS = ("read", "blocks", "inline", "to_html", "fill", "write")
+
+
+# Tiempos por fase de una sola página; se crea en el proceso que la renderiza
+# y se devuelve al proceso principal (es picklable)
+class PageTrace:
+    def __init__(self, from_path, memory=False):
+        self.from_path = str(from_path)
+        self.memory = memory
+        self.pid = os.getpid()
+        self.phases = []
+        self.peak_memory = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.phases.append((name, start, duration))
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory = max(self.peak_memory or 0, peak)
+
+    def total(self):
+        return sum(duration for _, _, duration in self.phases)
+
+    def durations(self):
+        totals = {}
+        for name, _, duration in self.phases:
+            totals[name] = totals.get(name, 0) + duration
+        return totals
+
+
+# Junta las fases del build y de cada página; exporta un resumen de las
+# páginas más lentas y un archivo en formato Chrome trace (chrome://tracing)
+class Tracer:
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.origin = time.perf_counter()
+        self.build_phases = []
+        self.pages = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.build_phases.append((name, start, time.perf_counter() - start))
+
+    def add_page(self, page_trace):
+        self.pages.append(page_trace)
+
+    # PageTrace enciende tracemalloc en el proceso que renderiza (el principal
+    # si el build es en serie); se apaga al terminar el build
+    def close(self):
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def chrome_trace(self):
+        events = []
+        pid = os.getpid()
+        for name, start, duration in self.build_phases:
+            events.append(self._event(name, "build", pid, 0, start, duration, {}))
+        for page in self.pages:
+            args = {"page": page.from_path}
+            if page.peak_memory is not None:
+                args["peak_memory"] = page.peak_memory
+            page_start = page.phases[0][1] if page.phases else self.origin
+            events.append(self._event(page.from_path, "page", page.pid, 1, page_start, page.total(), args))
+            for name, start, duration in page.phases:
+                events.append(self._event(name, "phase", page.pid, 1, start, duration, args))
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def _event(self, name, category, pid, tid, start, duration, args):
+        return {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "pid": pid,
+            "tid": tid,
+            "ts": (start - self.origin) * 1e6,
+            "dur": duration * 1e6,
+            "args": args,
+        }
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self, top=10):
+        lines = ["Time per phase:"]
+        for name, _, duration in self.build_phases:
+            lines.append(f"{name:<24} {duration * 1000:>10.2f} ms")
+        totals = {name: 0 for name in PAGE_PHASES}
+        for page in self.pages:
+            for name, duration in page.durations().items():
+                totals[name] = totals.get(name, 0) + duration
+        for name, duration in totals.items():
+            lines.append(f"{name:<24} {duration * 1000:>10.2f} ms")
+
+        header = f"{'page':<40} {'total':>9}" + "".join(f" {label:>10}" for label in PHASE_LABELS)
+        if self.memory:
+            header += f" {'peak KiB':>10}"
+        lines.append("")
+        lines.append(f"Slowest {min(top, len(self.pages))} of {len(self.pages)} pages (ms):")
+        lines.append(header)
+        slowest = sorted(self.pages, key=lambda page: page.total(), reverse=True)[:top]
+        for page in slowest:
+            durations = page.durations()
+            row = f"{page.from_path[-40:]:<40} {page.total() * 1000:>9.2f}"
+            row += "".join(f" {durations.get(name, 0) * 1000:>10.2f}" for name in PAGE_PHASES)
+            if self.memory:
+                row += f" {(page.peak_memory or 0) / 1024:>10.1f}"
+            lines.append(row)
+        return "\n".join(lines)
@@ -0,0 +1,182 @@
+import json
+import os
+import posixpath
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+from metadata import body_lines, split_front_matter
+from node_delimiter import block_to_html_node, iter_typed_blocks
+
+LINKS_VERSION = 1
+LINK_PROPS = ("href", "src")
+
+
+class LinkReport:
+    def __init__(self):
+        self.pages = 0
+        self.links = 0
+        self.parsed = 0
+        self.reused = 0
+        self.broken = []
+
+    def __repr__(self):
+        return f"LinkReport(pages={self.pages}, links={self.links}, broken={len(self.broken)})"
+
+
+# Todas las urls que se pueden pedir al sitio: cada archivo de public y, para
+# los directorios con index.html, "/dir" y "/dir/". Es un set, así cada link
+# se verifica con un solo lookup
+def build_output_index(dir_path_public):
+    index = set()
+    _index_dir(dir_path_public, "/", index)
+    return index
+
+
+def _index_dir(dir_path, url, index):
+    for entry in os.scandir(dir_path):
+        if entry.is_dir():
+            _index_dir(entry.path, f"{url}{entry.name}/", index)
+            continue
+        index.add(url + entry.name)
+        if entry.name == "index.html":
+            index.add(url)
+            if url != "/":
+                index.add(url[:-1])
+
+
+# Los links de una página, tal como los renderiza el parser: solo se
+# convierten a nodos los bloques que contienen "](" y nunca los de código
+def page_links(markdown):
+    _, body = split_front_matter(markdown)
+    return _block_links(iter_typed_blocks(body.split("\n")))
+
+
+# Como page_links pero leyendo el archivo bloque a bloque, así una página
+# enorme no se carga entera en memoria
+def file_links(from_path):
+    with open(from_path, "r") as from_file:
+        return _block_links(iter_typed_blocks(body_lines(from_file)))
+
+
+def _block_links(typed_blocks):
+    links = []
+    for block, block_type in typed_blocks:
+        if block_type == "code" or "](" not in block:
+            continue
+        _collect_links(block_to_html_node(block, block_type), links)
+    return links
+
+
+def _collect_links(node, links):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.props:
+            for prop in LINK_PROPS:
+                if prop in node.props:
+                    links.append(node.props[prop])
+        if node.children:
+            stack.extend(reversed(node.children))
+
+
+# Links de cada fuente guardados en disco; solo se vuelven a parsear las
+# fuentes cuyo tamaño o mtime cambió desde la última revisión
+class LinkCache:
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != LINKS_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"version": LINKS_VERSION, "entries": self.entries}, f, sort_keys=True)
+
+
+# La url interna que apunta un link, o None si es externa o solo un ancla.
+# Los links relativos se resuelven contra el directorio de la página
+def resolve_link(url, page_url):
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = urllib.parse.unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page_url), path)
+    resolved = posixpath.normpath(path)
+    if path.endswith("/") and resolved != "/":
+        resolved += "/"
+    return resolved
+
+
+def _source_signature(from_path):
+    stat = os.stat(from_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _extract_links(batch):
+    return [file_links(from_path) for from_path in batch]
+
+
+# Revisa los links internos de pages [(fuente, salida)] contra lo que hay en
+# dir_path_public. Con cache solo se parsean las fuentes que cambiaron; esas se
+# reparten en lotes entre procesos si workers > 1. Verificar cada link es un
+# lookup en un set y se hace acá. El reporte sale en el orden de pages
+def check_links(pages, dir_path_public, workers=1, batch_size=256, cache=None):
+    index = build_output_index(dir_path_public)
+    public = os.path.abspath(dir_path_public)
+    report = LinkReport()
+    pages = [
+        (str(from_path), "/" + os.path.relpath(os.path.abspath(dest_path), public).replace(os.sep, "/"))
+        for from_path, dest_path in pages
+    ]
+    signatures = [_source_signature(from_path) for from_path, _ in pages]
+    links = [None] * len(pages)
+    stale = []
+    for position, (from_path, _) in enumerate(pages):
+        entry = cache.entries.get(from_path) if cache is not None else None
+        if entry is not None and entry["signature"] == signatures[position]:
+            links[position] = entry["links"]
+            report.reused += 1
+        else:
+            stale.append(position)
+
+    batches = [stale[start:start + batch_size] for start in range(0, len(stale), batch_size)]
+    jobs = [[pages[position][0] for position in batch] for batch in batches]
+    if workers == 1 or len(batches) < 2:
+        _add_links(links, batches, map(_extract_links, jobs), report)
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            _add_links(links, batches, executor.map(_extract_links, jobs), report)
+
+    for (from_path, page_url), found in zip(pages, links):
+        report.pages += 1
+        report.links += len(found)
+        for url in found:
+            target = resolve_link(url, page_url)
+            if target is not None and target not in index:
+                report.broken.append((from_path, url))
+    if cache is not None:
+        cache.entries = {
+            from_path: {"signature": signature, "links": found}
+            for (from_path, _), signature, found in zip(pages, signatures, links)
+        }
+    return report
+
+
+def _add_links(links, batches, results, report):
+    for batch, batch_links in zip(batches, results):
+        for position, found in zip(batch, batch_links):
+            links[position] = found
+            report.parsed += 1
@@ -1,22 +1,426 @@
+import argparse
+import contextlib
 import os
 import shutil
+import sys
+import time
 from copystatic import copy_files_recursive
-from gencontent import generate_page, generate_pages_recursive
+from gencontent import collect_pages, generate_listings, generate_pages, generate_pages_recursive, is_page, iter_pages, page_dest_path
+from blockcache import default_block_cache
+from instrument import Tracer
+from linkcheck import LinkCache, check_links
+from manifest import BuildManifest
+from metadata import MetadataIndex, listings
+from parsecache import ParseCache
+from pipeline import DEFAULT_QUEUE_SIZE, generate_pages_pipelined
+from postbuild import asset_urls, fingerprint_assets, precompress, rewrite_references
+from searchindex import SearchIndex
+from selection import SelectionError, SourceSelector, git_changed_files
+from shard import STRATEGIES, ShardError, merge_shards, parse_shard_spec, plan_shards, shard_dir, write_shard_info
+from watch import watch
 
 dir_path_static = "./static"
 dir_path_public = "./public"
 dir_path_content = "./content"
 template_path = "./template.html"
+manifest_path = "./.build-manifest.json"
+parse_cache_path = "./.cache/pages"
+metadata_path = "./.cache/metadata.json"
+search_cache_path = "./.cache/search.json"
+links_cache_path = "./.cache/links.json"
+search_index_name = "search.bin"
+shards_path = "./shards"
 
-def main():
-    print("Deleting public directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into ./public")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages and assets whose sources changed since the last build",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes used to render pages (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        help="hardlink static files into ./public instead of copying them",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building, watch content, static and the template and rebuild what changes",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="time every build phase per page, print the slowest pages and write a Chrome trace to FILE",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also record each page's peak memory with tracemalloc (slower)",
+    )
+    parser.add_argument(
+        "--no-block-cache",
+        action="store_true",
+        help="render every block from scratch instead of reusing blocks repeated across pages",
+    )
+    parser.add_argument(
+        "--no-parse-cache",
+        action="store_true",
+        help="do not reuse rendered page bodies from the on-disk parse cache",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="empty the on-disk parse cache before building",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="maximum size of the on-disk parse cache (default: 256 MB)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz siblings for html, css, js and svg files in ./public",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static assets to content-hashed names and point the pages at them",
+    )
+    parser.add_argument(
+        "--listings",
+        action="store_true",
+        help="write an index.html listing the pages of every content directory that has no index.md",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help=f"write an inverted index of the words of every page to ./public/{search_index_name} for client-side search",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading, rendering and writing pages in bounded stages and report each stage's throughput",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        metavar="N",
+        help=f"pages each pipeline queue can hold (default: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="after building, check every internal link and image against ./public and fail if any is broken",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="GLOB",
+        help="only build sources matching GLOB (e.g. 'content/blog/*'); can be repeated. The rest of ./public is left as is",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="only build sources that git reports as changed since REF (all pages if the template changed)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_spec,
+        metavar="I/N",
+        help="build only shard I of N into ./shards/I (static files go to shard 1); combine them with --merge",
+    )
+    parser.add_argument(
+        "--shard-strategy",
+        choices=STRATEGIES,
+        default="size",
+        help="how pages are split between shards: balanced by file size or by path hash (default: size)",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="combine the shard outputs in ./shards into ./public, failing on conflicting paths",
+    )
+    return parser.parse_args(argv)
+
+def shard_spec(spec):
+    try:
+        return parse_shard_spec(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.shard is not None:
+        build_shard(args)
+        return
+    if args.merge:
+        merge(args)
+        return
+    try:
+        manifest = build(args)
+    except SelectionError as e:
+        sys.exit(f"error: {e}")
+    if args.check_links and not report_links(args):
+        sys.exit(1)
+    if args.watch:
+        print("Watching for changes (Ctrl+C to stop)...")
+        try:
+            watch(
+                [dir_path_content, dir_path_static, template_path],
+                lambda changed: rebuild_changed(changed, manifest, args),
+            )
+        except KeyboardInterrupt:
+            pass
+
+def build(args):
+    default_block_cache.enabled = not args.no_block_cache
+    selector = make_selector(args)
+    if selector is not None:
+        # build parcial: el resto de public y del manifest no se toca. Las
+        # fuentes borradas quedan en el manifest para borrar su salida al final
+        manifest = BuildManifest.load(manifest_path)
+        if not args.incremental:
+            for source in [source for source in manifest.entries
+                           if ":" not in source and selector.selects_page(source) and os.path.exists(source)]:
+                del manifest.entries[source]
+    elif args.incremental and os.path.exists(dir_path_public):
+        manifest = BuildManifest.load(manifest_path)
+    else:
+        print("Deleting public directory...")
+        if os.path.exists(dir_path_public):
+            shutil.rmtree(dir_path_public)
+        manifest = BuildManifest(manifest_path)
+
+    if args.clear_cache:
+        print("Clearing parse cache...")
+        ParseCache(parse_cache_path).clear()
+    run_build(args, manifest, selector)
+    return manifest
+
+def report_links(args):
+    print("Checking links...")
+    cache = LinkCache.load(links_cache_path)
+    report = check_links(iter_pages(dir_path_content, dir_path_public), dir_path_public, worker_count(args), cache=cache)
+    cache.save()
+    for from_path, url in report.broken:
+        print(f" ! {from_path}: broken link {url}")
+    print(f" * {report.links} links in {report.pages} pages ({report.parsed} parsed, {report.reused} cached), "
+          f"{len(report.broken)} broken")
+    return not report.broken
+
+def make_selector(args):
+    if not args.only and args.changed_since is None:
+        return None
+    changed = None
+    if args.changed_since is not None:
+        changed = git_changed_files(args.changed_since)
+    return SourceSelector(args.only, changed, template_path)
+
+# Un build completo (incremental según el manifest) sobre un manifest ya
+# cargado; el daemon lo llama repetidamente con el mismo manifest
+def run_build(args, manifest, selector=None):
+    tracer = None
+    if args.trace or args.trace_memory:
+        tracer = Tracer(memory=args.trace_memory)
+    try:
+        build_pass(args, manifest, selector, tracer)
+    finally:
+        # apaga tracemalloc aunque el build falle: en watch y daemon el
+        # proceso sigue vivo
+        if tracer is not None:
+            tracer.close()
+
+    if tracer is not None:
+        print(tracer.summary())
+        if args.trace:
+            tracer.write_chrome_trace(args.trace)
+            print(f"Wrote trace to {args.trace}")
+
+
+def build_pass(args, manifest, selector, tracer):
+    parse_cache = make_parse_cache(args)
 
     print("Copying static files to public directory...")
-    copy_files_recursive(dir_path_static, dir_path_public)
+    with tracer.phase("static copy") if tracer is not None else contextlib.nullcontext():
+        summary = copy_files_recursive(dir_path_static, dir_path_public, manifest, hardlink=args.link_static,
+                                       only=selector.matches if selector is not None else None)
+    print(f" * {summary.copied} copied, {summary.skipped} unchanged, {summary.bytes} bytes")
 
     print("Generating page...")
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public)
+    only = selector.count_page if selector is not None else None
+    if args.pipeline and tracer is None:
+        stats = generate_pages_pipelined(
+            iter_pages(dir_path_content, dir_path_public, only), template_path, manifest,
+            worker_count(args), parse_cache, args.queue_size,
+        )
+        print(stats.summary())
+    else:
+        generate_pages_recursive(dir_path_content, template_path, dir_path_public, manifest, worker_count(args), tracer, parse_cache, only)
+    if selector is not None:
+        print(f" * {selector.selected} pages selected, {selector.skipped} skipped")
+    if parse_cache is not None:
+        parse_cache.trim()
+    if args.listings:
+        write_listings(manifest)
+    if args.search_index:
+        write_search_index(manifest)
+
+    post_build(args, manifest, tracer)
+
+    if selector is None:
+        removed = manifest.prune()
+    else:
+        removed = [manifest.remove(source) for source in selector.deleted(manifest.entries)]
+    for output in removed:
+        if output is not None:
+            print(f" - removed {output}")
+    manifest.save()
+    print(f"Built {manifest.built} files, skipped {manifest.skipped} unchanged")
+    if default_block_cache.hits or default_block_cache.misses:
+        print(f" * block cache: {default_block_cache.hits} hits, {default_block_cache.misses} misses")
+
+# Construye un solo shard: sus páginas (según el plan) y, en el shard 1, los
+# estáticos, en ./shards/I/public con su propio manifest. El post-proceso
+# (fingerprint, gzip) se hace en --merge sobre el sitio completo
+def build_shard(args):
+    index, count = args.shard
+    out_dir = shard_dir(shards_path, index)
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    shard_public = os.path.join(out_dir, "public")
+    os.makedirs(shard_public)
+    default_block_cache.enabled = not args.no_block_cache
+    manifest = BuildManifest(os.path.join(out_dir, "manifest.json"))
+
+    if index == 1:
+        print("Copying static files to shard directory...")
+        copy_files_recursive(dir_path_static, shard_public, manifest, hardlink=args.link_static)
+    pages = plan_shards(collect_pages(dir_path_content, shard_public), count, dir_path_content, args.shard_strategy)[index - 1]
+    print(f"Generating shard {index}/{count} ({len(pages)} pages)...")
+    generate_pages(pages, template_path, manifest, worker_count(args), parse_cache=make_parse_cache(args))
+    manifest.save()
+    write_shard_info(shards_path, index, count, args.shard_strategy, len(pages))
+    print(f"Built {manifest.built} files into {out_dir}")
+
+def merge(args):
+    manifest = BuildManifest(manifest_path)
+    try:
+        summary = merge_shards(shards_path, dir_path_public, manifest, replace=True)
+    except ShardError as e:
+        sys.exit(f"error: {e}")
+    print(f"Merged {summary.files} files ({summary.bytes} bytes) from {summary.shards} shards")
+    if args.listings:
+        write_listings(manifest)
+    if args.search_index:
+        write_search_index(manifest)
+    post_build(args, manifest)
+    manifest.save()
+
+# Las páginas de listado salen del índice de metadata (título y front matter),
+# que solo vuelve a leer el principio de las fuentes que cambiaron
+def write_listings(manifest):
+    index = MetadataIndex.load(metadata_path)
+    pages = index.scan(iter_pages(dir_path_content, dir_path_public), dir_path_public)
+    index.save()
+    print(f"Writing listing pages ({index.scanned} scanned, {index.reused} cached)...")
+    generate_listings(listings(pages, dir_path_public), template_path, manifest)
+
+# Solo se tokenizan las páginas que cambiaron desde el último índice
+def write_search_index(manifest):
+    index = SearchIndex.load(search_cache_path)
+    index.update(iter_pages(dir_path_content, dir_path_public), dir_path_public)
+    index.save()
+    size, written = index.write(os.path.join(dir_path_public, search_index_name), manifest)
+    print(f"Search index: {len(index.entries)} pages, {index.tokenized} tokenized, {index.reused} reused, "
+          f"{size} bytes{'' if written else ' (unchanged)'}")
+
+def post_build(args, manifest, tracer=None):
+    if args.fingerprint:
+        print("Fingerprinting static assets...")
+        with tracer.phase("fingerprint") if tracer is not None else contextlib.nullcontext():
+            mapping = fingerprint_assets(dir_path_static, dir_path_public, manifest)
+            rewritten = rewrite_references(dir_path_public, mapping, pages_to_rewrite(manifest))
+        print(f" * {len(mapping)} assets, {rewritten} pages rewritten")
+    elif any(source.startswith("fingerprint:") for source in manifest.entries):
+        # el build anterior usó fingerprints: las páginas que no se regeneraron
+        # todavía apuntan a ellos
+        rewrite_references(dir_path_public, asset_urls(dir_path_static))
+    if args.precompress:
+        print("Precompressing output...")
+        with tracer.phase("precompress") if tracer is not None else contextlib.nullcontext():
+            # zlib suelta el GIL: al menos un hilo por core aunque el render sea en serie
+            summary = precompress(dir_path_public, manifest, max(worker_count(args), os.cpu_count() or 1))
+        print(f" * {summary.compressed} compressed, {summary.reused} reused, "
+              f"{summary.skipped} not worth it, {summary.saved_bytes} bytes saved")
+
+# Las páginas que hay que apuntar a los fingerprints: solo las escritas en esta
+# pasada, salvo que haya cambiado el hash de algún asset (o sea el primer
+# build), que puede afectar a cualquier página (None: todas)
+def pages_to_rewrite(manifest):
+    if any(source.startswith("fingerprint:") for source in manifest.written):
+        return None
+    return [output for output in manifest.written.values() if output.endswith(".html")]
+
+def make_parse_cache(args):
+    if args.no_parse_cache:
+        return None
+    return ParseCache(parse_cache_path, args.cache_size * 1024 * 1024)
+
+def worker_count(args):
+    return args.workers if args.workers > 0 else os.cpu_count()
+
+def is_under(path, dir_path):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(dir_path)]) == os.path.abspath(dir_path)
+
+# Reconstruye solo lo afectado por los archivos cambiados: las páginas editadas,
+# todas si cambió el template, y la sincronización de static si tocaron un asset
+def rebuild_changed(changed, manifest, args):
+    start = time.perf_counter()
+    manifest.reset()
+    pages = []
+    static_changed = False
+    for path in changed:
+        if is_under(path, dir_path_content):
+            if not is_page(path):
+                continue
+            from_path = os.path.join(dir_path_content, os.path.relpath(path, dir_path_content))
+            if os.path.isfile(from_path):
+                pages.append((from_path, page_dest_path(from_path, dir_path_content, dir_path_public)))
+            elif manifest.remove(from_path) is not None:
+                print(f" - removed page for {from_path}")
+        elif is_under(path, dir_path_static):
+            static_changed = True
+            from_path = os.path.join(dir_path_static, os.path.relpath(path, dir_path_static))
+            if not os.path.exists(from_path):
+                manifest.remove(from_path)
+    if os.path.normpath(template_path) in changed:
+        pages = collect_pages(dir_path_content, dir_path_public)
+
+    try:
+        if static_changed:
+            copy_files_recursive(dir_path_static, dir_path_public, manifest, hardlink=args.link_static)
+        generate_pages(sorted(pages), template_path, manifest, worker_count(args), parse_cache=make_parse_cache(args))
+        if args.listings:
+            write_listings(manifest)
+        if args.search_index:
+            write_search_index(manifest)
+        post_build(args, manifest)
+    except Exception as e:
+        print(f" ! rebuild failed: {e}")
+    manifest.save()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Rebuilt {manifest.built} files ({len(changed)} changed) in {elapsed:.1f} ms")
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def hash_file(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# Guarda, por cada fuente, el hash de su contenido, el del template y la salida.
+# written tiene {fuente: salida} de lo que se escribió en la pasada actual
+class BuildManifest:
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.seen = set()
+        self.written = {}
+        self.built = 0
+        self.skipped = 0
+        self._hashes = {}
+
+    # Empieza una nueva pasada de build sobre el mismo manifest (watch, daemon)
+    def reset(self):
+        self.seen = set()
+        self.written = {}
+        self.built = 0
+        self.skipped = 0
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except ValueError:
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}))
+
+    # El hash se recalcula solo si cambió el tamaño o el mtime del archivo; en
+    # procesos largos (watch, daemon) evita volver a leer todo el árbol
+    def file_hash(self, path):
+        path = str(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, hash_file(path))
+            self._hashes[path] = cached
+        return cached[1]
+
+    def is_fresh(self, source, output, template_path=None, stamp=None):
+        source = str(source)
+        self.seen.add(source)
+        entry = self.entries.get(source)
+        if entry is None:
+            return False
+        template_hash = None
+        if template_path is not None:
+            template_hash = self.file_hash(template_path)
+        fresh = (
+            entry["hash"] == (stamp if stamp is not None else self.file_hash(source))
+            and entry.get("template_hash") == template_hash
+            and entry["output"] == str(output)
+            and os.path.exists(output)
+        )
+        if fresh:
+            self.skipped += 1
+        return fresh
+
+    # stamp reemplaza al hash del contenido cuando el llamador ya tiene una
+    # firma más barata (p.ej. tamaño y mtime de un asset estático)
+    def record(self, source, output, template_path=None, stamp=None, built=True):
+        source = str(source)
+        self.seen.add(source)
+        if built:
+            self.built += 1
+            self.written[source] = str(output)
+        else:
+            self.skipped += 1
+        template_hash = None
+        if template_path is not None:
+            template_hash = self.file_hash(template_path)
+        self.entries[source] = {
+            "hash": stamp if stamp is not None else self.file_hash(source),
+            "template_hash": template_hash,
+            "output": str(output),
+        }
+
+    # Borra las salidas cuyas fuentes ya no existen
+    def prune(self):
+        removed = []
+        for source in sorted(self.entries):
+            if source in self.seen:
+                continue
+            output = self.remove(source)
+            if output is not None:
+                removed.append(output)
+        return removed
+
+    # Borra la salida de source y, si la hay, su copia .gz del precompress
+    def remove(self, source):
+        entry = self.entries.pop(str(source), None)
+        if entry is None:
+            return None
+        self.remove(f"gzip:{os.path.normpath(entry['output'])}")
+        if not os.path.isfile(entry["output"]):
+            return None
+        output = entry["output"]
+        os.remove(output)
+        parent = os.path.dirname(output)
+        if parent and not os.listdir(parent):
+            os.rmdir(parent)
+        return output
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(
+                {"version": MANIFEST_VERSION, "entries": self.entries},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
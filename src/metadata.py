@@ -0,0 +1,231 @@
+import json
+import os
+import re
+from pathlib import Path, PurePosixPath
+
+METADATA_VERSION = 3
+FRONT_MATTER_DELIMITER = "---"
+FIELD_RE = re.compile(r"[\w-]+\s*:")
+TITLE_RE = re.compile(r"^# (.*)$", re.MULTILINE)
+
+
+class PageMetadata:
+    __slots__ = ("source", "output", "url", "title", "meta")
+
+    def __init__(self, source, output, url, title, meta=None):
+        self.source = source
+        self.output = output
+        self.url = url
+        self.title = title
+        self.meta = meta if meta is not None else {}
+
+    def to_json(self):
+        return {"output": self.output, "url": self.url, "title": self.title, "meta": self.meta}
+
+    @classmethod
+    def from_json(cls, source, data):
+        return cls(source, data["output"], data["url"], data["title"], data["meta"])
+
+    def __eq__(self, other):
+        if isinstance(other, PageMetadata):
+            return self.source == other.source and self.to_json() == other.to_json()
+        return False
+
+    def __repr__(self):
+        return f"PageMetadata({self.source!r}, {self.title!r}, {self.meta!r})"
+
+
+# Front matter opcional al principio del archivo, entre dos líneas "---", con
+# una línea "clave: valor" por campo. Si la línea después del primer "---" no
+# es un campo, el "---" es una línea horizontal del cuerpo y no front matter
+def split_front_matter(markdown):
+    if not markdown.startswith(FRONT_MATTER_DELIMITER + "\n"):
+        return {}, markdown
+    if not FIELD_RE.match(markdown, len(FRONT_MATTER_DELIMITER) + 1):
+        return {}, markdown
+    end = markdown.find("\n" + FRONT_MATTER_DELIMITER + "\n", len(FRONT_MATTER_DELIMITER))
+    if end == -1:
+        if not markdown.endswith("\n" + FRONT_MATTER_DELIMITER):
+            return {}, markdown
+        end = len(markdown) - len(FRONT_MATTER_DELIMITER) - 1
+    meta = parse_front_matter(markdown[len(FRONT_MATTER_DELIMITER) + 1:end + 1].split("\n"))
+    return meta, markdown[end + len(FRONT_MATTER_DELIMITER) + 2:]
+
+
+def parse_front_matter(lines):
+    meta = {}
+    for line in lines:
+        key, sep, value = line.partition(":")
+        if sep and key.strip():
+            meta[key.strip()] = value.strip()
+    return meta
+
+
+def find_title(markdown):
+    match = TITLE_RE.search(markdown)
+    return match.group(1) if match is not None else None
+
+
+# Lee líneas solo hasta tener el título: el front matter si lo hay y después
+# hasta el primer heading "# ". Devuelve (título, meta); el título del front
+# matter tiene prioridad y es None si no hay ninguno
+def scan_lines(lines):
+    lines = iter(lines)
+    meta = {}
+    first = next(lines, None)
+    if first is None:
+        return None, meta
+    if first.rstrip("\n") == FRONT_MATTER_DELIMITER:
+        second = next(lines, None)
+        if second is None or not FIELD_RE.match(second):
+            # "---" sin campos: una línea horizontal del cuerpo
+            first = second
+        else:
+            front_matter = [second.rstrip("\n")]
+            for line in lines:
+                if line.rstrip("\n") == FRONT_MATTER_DELIMITER:
+                    meta = parse_front_matter(front_matter)
+                    break
+                front_matter.append(line.rstrip("\n"))
+            else:
+                # sin cierre no es front matter: es parte del cuerpo
+                return next((line[2:] for line in front_matter if line.startswith("# ")), None), {}
+            # un "title:" vacío no cuenta, como en split_front_matter + find_title
+            if meta.get("title"):
+                return meta["title"], meta
+            first = None
+    if first is not None and first.startswith("# "):
+        return first[2:].rstrip("\n"), meta
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:].rstrip("\n"), meta
+    return None, meta
+
+
+# Las líneas del cuerpo, sin el front matter; para el render en streaming
+def body_lines(lines):
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    if first.rstrip("\n") == FRONT_MATTER_DELIMITER:
+        second = next(lines, None)
+        if second is None or not FIELD_RE.match(second):
+            yield first
+            if second is not None:
+                yield second
+            yield from lines
+            return
+        front_matter = [first, second]
+        for line in lines:
+            if line.rstrip("\n") == FRONT_MATTER_DELIMITER:
+                break
+            front_matter.append(line)
+        else:
+            yield from front_matter
+            return
+    else:
+        yield first
+    yield from lines
+
+
+def scan_file(path):
+    with open(path, "r") as f:
+        return scan_lines(f)
+
+
+# Las páginas index.html se enlazan por su directorio, con la barra final que
+# el servidor exige (sin ella responde con una redirección)
+def page_url(output, dir_path_public):
+    url = PurePosixPath("/", Path(os.path.relpath(output, dir_path_public)).as_posix())
+    if url.name == "index.html":
+        directory = str(url.parent)
+        return directory if directory == "/" else directory + "/"
+    return str(url)
+
+
+# Índice de título y front matter de todas las páginas, guardado en disco y
+# reutilizado mientras el tamaño y mtime de la fuente no cambien. Alcanza
+# para armar menús y páginas de listado sin renderizar ningún cuerpo
+class MetadataIndex:
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.pages = []
+        self.scanned = 0
+        self.reused = 0
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != METADATA_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}))
+
+    # Actualiza el índice con pages [(fuente, salida)] y devuelve su metadata
+    # en el mismo orden; las fuentes que ya no están se olvidan
+    def scan(self, pages, dir_path_public):
+        entries = {}
+        self.pages = []
+        for from_path, dest_path in pages:
+            source = str(from_path)
+            stat = os.stat(source)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = self.entries.get(source)
+            if entry is not None and entry["signature"] == signature and entry["output"] == str(dest_path):
+                self.reused += 1
+            else:
+                title, meta = scan_file(source)
+                url = page_url(dest_path, dir_path_public)
+                entry = {"signature": signature, **PageMetadata(source, str(dest_path), url, title, meta).to_json()}
+                self.scanned += 1
+            entries[source] = entry
+            self.pages.append(PageMetadata.from_json(source, entry))
+        self.entries = entries
+        return self.pages
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"version": METADATA_VERSION, "entries": self.entries}, f, sort_keys=True)
+
+
+# Páginas de listado para los directorios sin index.md: {salida del listado:
+# (título, [(título, url)])}. Cada listado enlaza las páginas del directorio
+# y sus subdirectorios (a su index o a su propio listado)
+def listings(pages, dir_path_public):
+    public = os.path.normpath(dir_path_public)
+    indexes = {}
+    children = {public: []}
+    for page in pages:
+        output = os.path.normpath(page.output)
+        directory = os.path.dirname(output)
+        if os.path.basename(output) == "index.html":
+            indexes[directory] = page
+        else:
+            children.setdefault(directory, []).append((page.title or page.url, page.url))
+        while directory != public and directory not in children:
+            children[directory] = []
+            directory = os.path.dirname(directory)
+    for directory in sorted(children):
+        if directory == public:
+            continue
+        parent = os.path.dirname(directory)
+        index = indexes.get(directory)
+        if index is not None:
+            children[parent].append((index.title or index.url, index.url))
+        else:
+            children[parent].append((os.path.basename(directory), page_url(os.path.join(directory, "index.html"), public)))
+    result = {}
+    for directory in sorted(children):
+        if directory in indexes:
+            continue
+        title = os.path.basename(directory) if directory != public else "Home"
+        result[os.path.join(directory, "index.html")] = (title, children[directory])
+    return result
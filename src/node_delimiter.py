@@ -1,5 +1,5 @@
 from textnode import TextNode, TextType, text_node_to_html_node
-from htmlnode import ParentNode
+from htmlnode import ParentNode, RawHTML
 import re
 
 # Separamos el markdown en diferentes bloques de markdown
@@ -15,6 +15,23 @@ def markdown_to_blocks(markdown):
             new_block.append(cleaned_block)
     return new_block
 
+# Versión incremental de markdown_to_blocks: recibe un iterable de líneas
+# (p.ej. un archivo abierto) y va entregando los bloques uno a uno, así en
+# memoria solo está el bloque actual. Un bloque termina en una línea vacía o
+# con solo espacios, igual que con el re.split de markdown_to_blocks
+def iter_markdown_blocks(lines):
+    current = []
+    for line in lines:
+        cleaned_line = line.strip()
+        if not cleaned_line:
+            if current:
+                yield "\n".join(current)
+                current = []
+            continue
+        current.append(cleaned_line)
+    if current:
+        yield "\n".join(current)
+
 #identificamos que tipo de bloque es el bloque markdown
 def block_to_block_type(block):
     lines = block.split("\n")
@@ -46,19 +63,143 @@ def block_to_block_type(block):
     else:
         return "paragraph"
 
+
+# ------------------------------------------------------------------
+#   Parser de bloques por líneas: separa y clasifica en una sola pasada
+
+# un solo match por línea; el primer carácter decide qué alternativa aplica
+LINE_MARKER_RE = re.compile(r"(#{1,6} )|(>+ )|([*-]+ )|([0-9])\. ")
+
+# Recorre las líneas una vez y entrega (bloque, tipo) con las mismas reglas que
+# markdown_to_blocks + block_to_block_type. La diferencia: un bloque que empieza
+# con una línea ``` es código cercado y sigue hasta el ``` de cierre aunque
+# tenga líneas vacías (o líneas que parecen headings) dentro
+def iter_typed_blocks(lines):
+    current = []
+    fenced = False
+    any_heading = False
+    all_quote = all_unordered = all_ordered = True
+    expected_number = 1
+    for line in lines:
+        line = line.strip()
+        if fenced:
+            current.append(line)
+            if line.startswith("```"):
+                yield "\n".join(current), "code"
+                current = []
+                fenced = False
+            continue
+        if not line:
+            if current:
+                yield "\n".join(current), _typed_block_type(
+                    current, any_heading, all_quote, all_unordered, all_ordered)
+                current = []
+            continue
+        if not current:
+            any_heading = False
+            all_quote = all_unordered = all_ordered = True
+            expected_number = 1
+            if line.startswith("```") and line.count("```") == 1:
+                current.append(line)
+                fenced = True
+                continue
+        current.append(line)
+        marker = LINE_MARKER_RE.match(line)
+        kind = marker.lastindex if marker is not None else 0
+        if kind == 1:
+            any_heading = True
+        if kind != 2:
+            all_quote = False
+        if kind != 3:
+            all_unordered = False
+        if kind == 4 and int(marker.group(4)) == expected_number:
+            expected_number += 1
+        else:
+            all_ordered = False
+    if fenced:
+        # bloque de código sin cerrar: se vuelve a las reglas de siempre
+        for block in markdown_to_blocks("\n".join(current)):
+            yield block, block_to_block_type(block)
+    elif current:
+        yield "\n".join(current), _typed_block_type(
+            current, any_heading, all_quote, all_unordered, all_ordered)
+
+def _typed_block_type(lines, any_heading, all_quote, all_unordered, all_ordered):
+    if any_heading:
+        return "heading"
+    if all_quote:
+        return "quote"
+    if all_unordered:
+        return "unordered_list"
+    if all_ordered:
+        return "ordered_list"
+    if lines[0].startswith("```") and lines[-1].startswith("```"):
+        return "code"
+    return "paragraph"
+
+def markdown_to_typed_blocks(markdown):
+    return list(iter_typed_blocks(markdown.split("\n")))
+
     
 #Genera el bloque completo de markdown a html node        
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def markdown_to_html_node(markdown, cache=None):
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
+    for block, block_type in iter_typed_blocks(markdown.split("\n")):
+        if cache is not None and cache.enabled:
+            children.append(cached_block_to_html_node(block, cache, block_type))
+            continue
+        html_node = block_to_html_node(block, block_type)
         children.append(html_node)
     return ParentNode("div", children, None)
 
+# Versión por lotes de markdown_to_html_node, para renderizar muchos documentos
+# en memoria compartiendo la cache de bloques
+def render_many(markdowns, cache=None):
+    return [markdown_to_html_node(markdown, cache) for markdown in markdowns]
+
+# Contenido de página que se renderiza mientras se escribe: cada bloque se lee,
+# se convierte y se escribe antes de pasar al siguiente. Sirve como valor de
+# Template.write igual que un HTMLNode
+class StreamingMarkdown:
+    __slots__ = ("lines", "cache")
+
+    def __init__(self, lines, cache=None):
+        self.lines = lines
+        self.cache = cache
+
+    def write_html(self, fp):
+        self.emit_html(fp.write)
+
+    def emit_html(self, write):
+        started = False
+        for block, block_type in iter_typed_blocks(self.lines):
+            if not started:
+                write("<div>")
+                started = True
+            if self.cache is not None and self.cache.enabled:
+                cached_block_to_html_node(block, self.cache, block_type).emit_html(write)
+            else:
+                block_to_html_node(block, block_type).emit_html(write)
+        if not started:
+            raise ValueError("Invalid HTML: no children")
+        write("</div>")
+
+# con cache el bloque se guarda ya serializado y se devuelve como un RawHTML
+# nuevo con el html, así la página no comparte nodos con otras páginas
+def cached_block_to_html_node(block, cache, block_type=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    key = f"{block_type}:{block}"
+    html = cache.get(key)
+    if html is None:
+        html = block_to_html_node(block, block_type).to_html()
+        cache.put(key, html)
+    return RawHTML(html)
+
 #convierte cada bloque de markdown a un nodo html según su tipo
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def block_to_html_node(block, block_type=None):
+    if block_type is None:
+        block_type = block_to_block_type(block)
     if block_type == "paragraph":
         return paragraph_to_html_node(block)
     if block_type == "heading":
@@ -78,10 +219,24 @@ def text_to_children(text):
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
+        if text_node.text_type == TextType.LINK and INLINE_TOKEN_RE.search(text_node.text):
+            link_node = link_to_html_node(text_node)
+            if link_node is not None:
+                children.append(link_node)
+                continue
         html_node = text_node_to_html_node(text_node)
         children.append(html_node)
     return children
 
+# negritas o cursivas dentro del texto del link; si el texto no es markdown
+# válido se deja como texto plano
+def link_to_html_node(text_node):
+    try:
+        children = text_to_children(text_node.text)
+    except ValueError:
+        return None
+    return ParentNode("a", children, {"href": text_node.url})
+
  # ------------------------------------------------------------------
  #        Logicas para convertir bloque de markdown a node html     
 
@@ -152,14 +307,42 @@ def quote_to_html_node(block):
 # -------------------------------------------------------------------
 
 
-# separa un texto en nodos markdown según el tipo de nodo
+INLINE_TOKEN_RE = re.compile(r"\*\*|\*|`|!?\[")
+INLINE_LINK_RE = re.compile(r"!?\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_DELIMITERS = {"**": TextType.BOLD, "*": TextType.ITALIC, "`": TextType.CODE}
+
+# separa un texto en nodos markdown según el tipo de nodo, en una sola pasada:
+# se busca el siguiente token (**, *, `, [ o ![) y se emite el nodo final
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes,"**",TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes,"*",TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes,"`",TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = []
+    plain_start = 0
+    position = 0
+    while True:
+        match = INLINE_TOKEN_RE.search(text, position)
+        if match is None:
+            break
+        token = match.group()
+        start = match.start()
+        if token in INLINE_DELIMITERS:
+            end = text.find(token, match.end())
+            if end == -1:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            if start > plain_start:
+                nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+            nodes.append(TextNode(text[match.end():end], INLINE_DELIMITERS[token]))
+            position = plain_start = end + len(token)
+            continue
+        link = INLINE_LINK_RE.match(text, start)
+        if link is None:
+            position = match.end()
+            continue
+        if start > plain_start:
+            nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+        text_type = TextType.IMAGE if token == "![" else TextType.LINK
+        nodes.append(TextNode(link.group(1), text_type, link.group(2)))
+        position = plain_start = link.end()
+    if plain_start < len(text) or not nodes:
+        nodes.append(TextNode(text[plain_start:], TextType.TEXT))
     return nodes
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
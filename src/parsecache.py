@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zlib
+
+# Cambiar cuando cambie el html que genera el parser; invalida la cache en disco
+PARSER_VERSION = "5"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+# Cache en disco del cuerpo html y el título de cada página, por hash del
+# markdown. Cada entrada es un archivo comprimido en un directorio de 256
+# shards, así que solo se lee lo que se usa. Una entrada corrupta se trata
+# como un miss y se borra
+class ParseCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def key(self, markdown):
+        hasher = hashlib.sha256(PARSER_VERSION.encode())
+        hasher.update(b"\0")
+        hasher.update(markdown.encode())
+        return hasher.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key[:2], key[2:])
+
+    def get(self, markdown):
+        entry_path = self._entry_path(self.key(markdown))
+        try:
+            with open(entry_path, "rb") as f:
+                data = json.loads(zlib.decompress(f.read()))
+            title, html = data["title"], data["html"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, zlib.error):
+            self._discard(entry_path)
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return title, html
+
+    def put(self, markdown, title, html):
+        entry_path = self._entry_path(self.key(markdown))
+        data = zlib.compress(json.dumps({"title": title, "html": html}).encode(), 6)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        # se escribe a un temporal y se renombra para que otro proceso nunca
+        # lea una entrada a medias
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            self._discard(tmp_path)
+
+    # Borra las entradas usadas hace más tiempo hasta quedar bajo max_bytes
+    def trim(self):
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                entry_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+                total += stat.st_size
+        removed = 0
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._discard(entry_path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def __repr__(self):
+        return f"ParseCache({self.path!r}, max_bytes={self.max_bytes})"
@@ -0,0 +1,286 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import gencontent
+from blockcache import counted, default_block_cache, init_worker_cache
+from gencontent import PageBuildError, page_values, render_page_body, write_page_streaming
+from template import load_template
+
+DEFAULT_QUEUE_SIZE = 64
+READ_THREADS = 4
+WRITE_THREADS = 4
+
+_DONE = object()
+
+
+class PipelineItem:
+    __slots__ = ("seq", "from_path", "dest_path", "markdown", "html", "streaming", "error")
+
+    def __init__(self, seq, from_path, dest_path):
+        self.seq = seq
+        self.from_path = from_path
+        self.dest_path = dest_path
+        self.markdown = None
+        self.html = None
+        self.streaming = False
+        self.error = None
+
+
+# Contadores de una etapa: páginas procesadas, tiempo ocupado sumando todos
+# sus hilos y profundidad de su cola de entrada (muestreada en cada get)
+class StageStats:
+    def __init__(self, name, threads, capacity):
+        self.name = name
+        self.threads = threads
+        self.capacity = capacity
+        self.items = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._lock = threading.Lock()
+
+    def sample(self, depth, busy=0.0, items=0):
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_total += depth
+            self.busy += busy
+            self.items += items
+
+    def mean_depth(self):
+        return self._depth_total / self.items if self.items else 0.0
+
+
+class PipelineStats:
+    def __init__(self, stages, capacity):
+        self.stages = stages
+        self.capacity = capacity
+        self.pages = 0
+        self.peak_in_flight = 0
+        self.elapsed = 0.0
+
+    def summary(self):
+        rate = self.pages / self.elapsed if self.elapsed else 0.0
+        lines = [f"Pipeline: {self.pages} pages in {self.elapsed:.2f} s ({rate:.0f} pages/s), "
+                 f"peak {self.peak_in_flight}/{self.capacity} in flight"]
+        for stage in self.stages:
+            utilization = stage.busy / (self.elapsed * stage.threads) if self.elapsed else 0.0
+            stage_rate = stage.items / self.elapsed if self.elapsed else 0.0
+            lines.append(
+                f"  {stage.name:<7}{stage.threads:>3} threads {stage_rate:>8.0f} pages/s "
+                f"{utilization:>4.0%} busy  queue max {stage.max_depth}/{stage.capacity} "
+                f"avg {stage.mean_depth():.1f}"
+            )
+        return "\n".join(lines)
+
+
+# Estado de los procesos de render: el template y la cache se mandan una sola
+# vez al crear cada proceso y no con cada página
+_worker_template = None
+_worker_parse_cache = None
+
+
+def _init_worker(template, parse_cache, block_cache_enabled):
+    global _worker_template, _worker_parse_cache
+    _worker_template = template
+    _worker_parse_cache = parse_cache
+    init_worker_cache(block_cache_enabled)
+
+
+def _render_in_worker(markdown):
+    return counted(render_page_html, markdown, _worker_template, _worker_parse_cache)
+
+
+def render_page_html(markdown, template, parse_cache=None):
+    title, content = render_page_body(markdown, parse_cache)
+    if hasattr(content, "to_html"):
+        content = content.to_html()
+    return template.render(page_values(title, content))
+
+
+# Build en tres etapas conectadas por colas acotadas: hilos que leen, workers
+# que renderizan (procesos si workers > 1) e hilos que escriben. Un semáforo
+# limita las páginas en vuelo, así la memoria no depende del tamaño del sitio
+# aunque pages sea un generador de millones de páginas. Los resultados se
+# reportan en el orden de pages, igual que generate_pages
+def generate_pages_pipelined(pages, template_path, manifest=None, workers=1, parse_cache=None,
+                             queue_size=DEFAULT_QUEUE_SIZE, read_threads=READ_THREADS, write_threads=WRITE_THREADS):
+    template = load_template(template_path)
+    capacity = 3 * queue_size + read_threads + workers + write_threads
+    read_stats = StageStats("read", read_threads, queue_size)
+    render_stats = StageStats("render", workers, queue_size)
+    write_stats = StageStats("write", write_threads, queue_size)
+    stats = PipelineStats([read_stats, render_stats, write_stats], capacity)
+
+    read_queue = queue.Queue(queue_size)
+    render_queue = queue.Queue(queue_size)
+    write_queue = queue.Queue(queue_size)
+    done_queue = queue.Queue()
+    slots = threading.Semaphore(capacity)
+    stopped = threading.Event()
+    manifest_lock = threading.Lock()
+    feed_errors = []
+    emitted = [0]
+
+    def feed():
+        seq = 0
+        try:
+            for from_path, dest_path in pages:
+                if manifest is not None:
+                    with manifest_lock:
+                        if manifest.is_fresh(from_path, dest_path, template_path):
+                            continue
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                _put(read_queue, PipelineItem(seq, from_path, dest_path), stopped)
+                seq += 1
+                stats.peak_in_flight = max(stats.peak_in_flight, seq - emitted[0])
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            _put(read_queue, _DONE, stopped)
+
+    def read(item):
+        if os.path.getsize(item.from_path) > gencontent.STREAMING_THRESHOLD:
+            item.streaming = True
+            return
+        with open(item.from_path, "r") as from_file:
+            item.markdown = from_file.read()
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                       initargs=(template, parse_cache, default_block_cache.enabled))
+
+    def render(item):
+        if item.streaming:
+            return
+        if executor is not None:
+            item.html, (hits, misses) = executor.submit(_render_in_worker, item.markdown).result()
+            default_block_cache.add_stats(hits, misses)
+        else:
+            item.html = render_page_html(item.markdown, template, parse_cache)
+        item.markdown = None
+
+    def write(item):
+        if item.streaming:
+            write_page_streaming(item.from_path, template, item.dest_path)
+            return
+        dest_dir_path = os.path.dirname(item.dest_path)
+        if dest_dir_path != "":
+            os.makedirs(dest_dir_path, exist_ok=True)
+        with open(item.dest_path, "w") as to_file:
+            to_file.write(item.html)
+        item.html = None
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += _start_stage(read, read_stats, read_queue, render_queue, stopped)
+    threads += _start_stage(render, render_stats, render_queue, write_queue, stopped)
+    threads += _start_stage(write, write_stats, write_queue, done_queue, stopped)
+
+    # Si el consumidor falla los hilos pueden estar trabados en el semáforo o
+    # en una cola: se libera el semáforo, los puts a colas llenas se rinden al
+    # ver stopped y a los que esperan en un get se les manda _DONE hasta que
+    # terminen todos, así el error sale en vez de colgar el build
+    def abort():
+        stopped.set()
+        slots.release(capacity)
+        while True:
+            for stage_queue in (read_queue, render_queue, write_queue):
+                try:
+                    stage_queue.put_nowait(_DONE)
+                except queue.Full:
+                    pass
+            alive = [thread for thread in threads if thread.is_alive()]
+            if not alive:
+                return
+            alive[0].join(0.05)
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    failures = []
+    pending = {}
+    next_seq = 0
+    try:
+        while True:
+            item = done_queue.get()
+            if item is _DONE:
+                break
+            pending[item.seq] = item
+            while next_seq in pending:
+                item = pending.pop(next_seq)
+                next_seq += 1
+                emitted[0] = next_seq
+                slots.release()
+                print(f" * {item.from_path} with {template_path} -> {item.dest_path}")
+                if item.error is not None:
+                    failures.append(PageBuildError(item.from_path, item.error))
+                elif manifest is not None:
+                    with manifest_lock:
+                        manifest.record(item.from_path, item.dest_path, template_path)
+    except BaseException:
+        abort()
+        raise
+    finally:
+        for thread in threads:
+            thread.join()
+        if executor is not None:
+            executor.shutdown()
+    stats.pages = next_seq
+    stats.elapsed = time.perf_counter() - start
+
+    if feed_errors:
+        raise feed_errors[0]
+    if failures:
+        for failure in failures[1:]:
+            print(f" ! {failure}")
+        raise failures[0] from failures[0].error
+    return stats
+
+
+# put que se rinde si el pipeline se detuvo mientras la cola estaba llena
+def _put(stage_queue, item, stopped):
+    while not stopped.is_set():
+        try:
+            stage_queue.put(item, timeout=0.05)
+            return
+        except queue.Full:
+            pass
+
+
+# Arranca los hilos de una etapa. Cada hilo que ve el _DONE lo devuelve a la
+# cola para sus hermanos; el último en terminar lo pasa a la etapa siguiente.
+# Con stopped puesto los hilos terminan sin procesar lo que queda
+def _start_stage(function, stats, input_queue, output_queue, stopped):
+    remaining = [stats.threads]
+    lock = threading.Lock()
+
+    def run():
+        while True:
+            depth = input_queue.qsize()
+            item = input_queue.get()
+            if stopped.is_set():
+                break
+            if item is _DONE:
+                _put(input_queue, _DONE, stopped)
+                break
+            start = time.perf_counter()
+            if item.error is None:
+                try:
+                    function(item)
+                except Exception as e:
+                    item.error = e
+                    item.markdown = item.html = None
+            stats.sample(depth, time.perf_counter() - start, 1)
+            _put(output_queue, item, stopped)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            _put(output_queue, _DONE, stopped)
+
+    return [threading.Thread(target=run, daemon=True) for _ in range(stats.threads)]
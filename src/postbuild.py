@@ -0,0 +1,172 @@
+import os
+import re
+import shutil
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file
+
+COMPRESS_EXTENSIONS = (".html", ".css", ".js", ".svg")
+FINGERPRINT_EXTENSIONS = (".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".woff", ".woff2")
+FINGERPRINT_LENGTH = 10
+FINGERPRINT_RE = re.compile(rf"\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}(\.[^./]+)$")
+
+
+class CompressSummary:
+    def __init__(self):
+        self.compressed = 0
+        self.reused = 0
+        self.skipped = 0
+        self.saved_bytes = 0
+
+    def __repr__(self):
+        return (f"CompressSummary(compressed={self.compressed}, reused={self.reused}, "
+                f"skipped={self.skipped}, saved_bytes={self.saved_bytes})")
+
+
+# ------------------------------------------------------------------
+#   Fingerprint de assets: index.css -> index.<hash>.css
+
+def fingerprinted_name(path, digest):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+# Copia cada asset de static con el hash de su contenido en el nombre y
+# devuelve {"/index.css": "/index.<hash>.css"}. El archivo original se deja
+# para no romper referencias de fuera del sitio
+def fingerprint_assets(dir_path_static, dir_path_public, manifest=None):
+    mapping = {}
+    for dirpath, _, filenames in os.walk(dir_path_static):
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(FINGERPRINT_EXTENSIONS):
+                continue
+            from_path = os.path.join(dirpath, filename)
+            relative_path = os.path.relpath(from_path, dir_path_static)
+            digest = manifest.file_hash(from_path) if manifest is not None else hash_file(from_path)
+            dest_path = fingerprinted_name(os.path.join(dir_path_public, relative_path), digest)
+            if not os.path.exists(dest_path):
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                shutil.copy2(from_path, dest_path)
+            if manifest is not None:
+                # la clave lleva prefijo para no chocar con la entrada de la copia normal
+                key = f"fingerprint:{from_path}"
+                previous = manifest.entries.get(key)
+                if previous is not None and previous["output"] != dest_path:
+                    manifest.remove(key)
+                manifest.record(key, dest_path, stamp=digest, built=previous is None or previous["output"] != dest_path)
+            url = "/" + relative_path.replace(os.sep, "/")
+            mapping[url] = "/" + os.path.relpath(dest_path, dir_path_public).replace(os.sep, "/")
+    return mapping
+
+
+# {url: url} de los assets que admiten fingerprint; con rewrite_references
+# devuelve las páginas a los nombres originales
+def asset_urls(dir_path_static):
+    urls = {}
+    for dirpath, _, filenames in os.walk(dir_path_static):
+        for filename in filenames:
+            if filename.lower().endswith(FINGERPRINT_EXTENSIONS):
+                relative_path = os.path.relpath(os.path.join(dirpath, filename), dir_path_static)
+                url = "/" + relative_path.replace(os.sep, "/")
+                urls[url] = url
+    return urls
+
+
+# Reescribe href/src de las páginas generadas para apuntar a los assets con
+# fingerprint. También reconoce un fingerprint anterior, así las páginas que no
+# se regeneraron en un build incremental quedan al día. pages limita las .html
+# que se revisan; con None se recorre todo dir_path_public
+def rewrite_references(dir_path_public, mapping, pages=None):
+    if not mapping:
+        return 0
+    patterns = []
+    for url in sorted(mapping, key=len, reverse=True):
+        stem, ext = os.path.splitext(url)
+        patterns.append(re.escape(stem) + rf"(?:\.[0-9a-f]{{{FINGERPRINT_LENGTH}}})?" + re.escape(ext))
+    reference_re = re.compile(r'((?:href|src)=")(' + "|".join(patterns) + r')(")')
+
+    def replace(match):
+        url = match.group(2)
+        if url not in mapping:
+            url = FINGERPRINT_RE.sub(r"\1", url)
+        return match.group(1) + mapping.get(url, match.group(2)) + match.group(3)
+
+    if pages is None:
+        pages = _html_files(dir_path_public)
+    rewritten = 0
+    for path in pages:
+        with open(path, "r") as f:
+            html = f.read()
+        new_html = reference_re.sub(replace, html)
+        if new_html != html:
+            replace_file(path, new_html.encode())
+            rewritten += 1
+    return rewritten
+
+
+# Escribe un archivo nuevo y lo pone en lugar de path en vez de escribir encima:
+# con --link-static path puede ser un hardlink a un archivo de static
+def replace_file(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _html_files(dir_path):
+    for dirpath, _, filenames in os.walk(dir_path):
+        for filename in filenames:
+            if filename.endswith(".html"):
+                yield os.path.join(dirpath, filename)
+
+
+# ------------------------------------------------------------------
+#   Precompresión: escribe page.html.gz al lado de page.html
+
+def gzip_bytes(data):
+    # wbits=31 produce el formato gzip que entienden los servidores y navegadores
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31, 9)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    compressed = gzip_bytes(data)
+    gz_path = path + ".gz"
+    if len(compressed) >= len(data):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return None
+    replace_file(gz_path, compressed)
+    return len(data) - len(compressed)
+
+
+# Comprime en un pool de hilos (zlib suelta el GIL). Con manifest, un .gz cuyo
+# archivo de origen tiene los mismos bytes que la última vez se reutiliza
+def precompress(dir_path_public, manifest=None, workers=None):
+    summary = CompressSummary()
+    paths = []
+    for dirpath, _, filenames in os.walk(dir_path_public):
+        for filename in sorted(filenames):
+            if not filename.endswith(COMPRESS_EXTENSIONS):
+                continue
+            # normalizada, como la salida de las páginas: así manifest.remove
+            # encuentra el .gz de una salida borrada
+            path = os.path.normpath(os.path.join(dirpath, filename))
+            if manifest is not None and manifest.is_fresh(f"gzip:{path}", path + ".gz", stamp=manifest.file_hash(path)):
+                summary.reused += 1
+                continue
+            paths.append(path)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, saved in zip(paths, executor.map(compress_file, paths)):
+            if saved is None:
+                summary.skipped += 1
+                continue
+            summary.compressed += 1
+            summary.saved_bytes += saved
+            if manifest is not None:
+                manifest.record(f"gzip:{path}", path + ".gz", stamp=manifest.file_hash(path))
+    return summary
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import re
+
+import gencontent
+from metadata import body_lines, find_title, page_url, scan_lines, split_front_matter
+from node_delimiter import block_to_html_node, iter_typed_blocks, markdown_to_typed_blocks
+
+SEARCH_VERSION = 2
+MAGIC = b"SIDX"
+TOKEN_RE = re.compile(r"\w{2,64}")
+
+
+# Términos únicos de una página, ordenados. Se tokeniza el texto de los nodos
+# que produce el parser (lo que el lector ve), no el markdown crudo
+def page_terms(markdown):
+    _, body = split_front_matter(markdown)
+    return _block_terms(markdown_to_typed_blocks(body))
+
+
+# (título, términos) de una fuente. Las páginas enormes se leen bloque a
+# bloque, como en el render en streaming, para no cargarlas enteras
+def file_terms(from_path):
+    if os.path.getsize(from_path) > gencontent.STREAMING_THRESHOLD:
+        with open(from_path, "r") as from_file:
+            title, _ = scan_lines(from_file)
+        with open(from_path, "r") as from_file:
+            return title, _block_terms(iter_typed_blocks(body_lines(from_file)))
+    with open(from_path, "r") as from_file:
+        markdown = from_file.read()
+    meta, body = split_front_matter(markdown)
+    return meta.get("title") or find_title(body), _block_terms(markdown_to_typed_blocks(body))
+
+
+def _block_terms(typed_blocks):
+    terms = set()
+    for block, block_type in typed_blocks:
+        stack = [block_to_html_node(block, block_type)]
+        while stack:
+            node = stack.pop()
+            if node.children:
+                stack.extend(node.children)
+            elif node.value:
+                terms.update(TOKEN_RE.findall(node.value.lower()))
+            if node.props and "alt" in node.props:
+                terms.update(TOKEN_RE.findall(node.props["alt"].lower()))
+    return sorted(terms)
+
+
+def encode_varint(number, out):
+    while number >= 0x80:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def decode_varint(data, position):
+    number = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, position
+        shift += 7
+
+
+def _encode_string(text, out):
+    data = text.encode()
+    encode_varint(len(data), out)
+    out.extend(data)
+
+
+def _decode_string(data, position):
+    length, position = decode_varint(data, position)
+    return data[position:position + length].decode(), position + length
+
+
+# Formato binario (todos los enteros son varints LEB128):
+#   "SIDX" versión
+#   páginas: cantidad, y por página url y título (largo + utf-8)
+#   términos: cantidad, y por término (en orden) el texto, el largo de su
+#   lista y los ids de página como diferencias con el anterior
+def encode_index(pages, postings):
+    out = bytearray(MAGIC)
+    out.append(SEARCH_VERSION)
+    encode_varint(len(pages), out)
+    for url, title in pages:
+        _encode_string(url, out)
+        _encode_string(title or "", out)
+    encode_varint(len(postings), out)
+    for term in sorted(postings):
+        _encode_string(term, out)
+        page_ids = postings[term]
+        encode_varint(len(page_ids), out)
+        previous = 0
+        for page_id in page_ids:
+            encode_varint(page_id - previous, out)
+            previous = page_id
+    return bytes(out)
+
+
+def decode_index(data):
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != SEARCH_VERSION:
+        raise ValueError("Not a search index")
+    position = len(MAGIC) + 1
+    count, position = decode_varint(data, position)
+    pages = []
+    for _ in range(count):
+        url, position = _decode_string(data, position)
+        title, position = _decode_string(data, position)
+        pages.append((url, title))
+    count, position = decode_varint(data, position)
+    postings = {}
+    for _ in range(count):
+        term, position = _decode_string(data, position)
+        length, position = decode_varint(data, position)
+        page_ids = []
+        page_id = 0
+        for _ in range(length):
+            delta, position = decode_varint(data, position)
+            page_id += delta
+            page_ids.append(page_id)
+        postings[term] = page_ids
+    return pages, postings
+
+
+# Páginas que contienen todas las palabras de query
+def search(pages, postings, query):
+    result = None
+    for term in TOKEN_RE.findall(query.lower()):
+        page_ids = set(postings.get(term, ()))
+        result = page_ids if result is None else result & page_ids
+    return [pages[page_id] for page_id in sorted(result or ())]
+
+
+# Términos de cada página guardados en disco; solo se vuelven a tokenizar las
+# fuentes cuyo tamaño o mtime cambió, y el índice invertido se arma de nuevo
+# desde esos términos sin leer ninguna página
+class SearchIndex:
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.tokenized = 0
+        self.reused = 0
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != SEARCH_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}))
+
+    def update(self, pages, dir_path_public):
+        entries = {}
+        for from_path, dest_path in pages:
+            source = str(from_path)
+            stat = os.stat(source)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = self.entries.get(source)
+            if entry is not None and entry["signature"] == signature and entry["output"] == str(dest_path):
+                self.reused += 1
+            else:
+                title, terms = file_terms(source)
+                entry = {
+                    "signature": signature,
+                    "output": str(dest_path),
+                    "url": page_url(dest_path, dir_path_public),
+                    "title": title,
+                    "terms": terms,
+                }
+                self.tokenized += 1
+            entries[source] = entry
+        self.entries = entries
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"version": SEARCH_VERSION, "entries": self.entries}, f, sort_keys=True)
+
+    # Los ids de página siguen el orden de las urls, así no dependen del orden
+    # en que se agregaron las fuentes
+    def encode(self):
+        entries = sorted(self.entries.values(), key=lambda entry: entry["url"])
+        postings = {}
+        for page_id, entry in enumerate(entries):
+            for term in entry["terms"]:
+                postings.setdefault(term, []).append(page_id)
+        return encode_index([(entry["url"], entry["title"]) for entry in entries], postings)
+
+    # Escribe el índice si cambió; devuelve (bytes, si se escribió)
+    def write(self, dest_path, manifest=None):
+        data = self.encode()
+        stamp = hashlib.sha256(data).hexdigest()
+        source = f"search:{dest_path}"
+        if manifest is not None and manifest.is_fresh(source, dest_path, stamp=stamp):
+            return len(data), False
+        with open(dest_path, "wb") as f:
+            f.write(data)
+        if manifest is not None:
+            manifest.record(source, dest_path, stamp=stamp)
+        return len(data), True
@@ -0,0 +1,69 @@
+import fnmatch
+import os
+import subprocess
+
+
+class SelectionError(Exception):
+    pass
+
+
+# Archivos cambiados desde ref según git (más los nuevos sin trackear),
+# relativos al directorio actual. Incluye los borrados; sin detección de
+# renombres, un archivo movido aparece con su nombre viejo y el nuevo
+def git_changed_files(ref):
+    commands = [
+        ["git", "diff", "--name-only", "--no-renames", "--relative", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    ]
+    changed = set()
+    for command in commands:
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, check=True)
+        except FileNotFoundError:
+            raise SelectionError("git is not installed")
+        except subprocess.CalledProcessError as e:
+            raise SelectionError(f"{' '.join(command)} failed: {e.stderr.strip()}")
+        changed.update(os.path.normpath(line) for line in result.stdout.splitlines() if line)
+    return changed
+
+
+# Decide qué fuentes entran en un build selectivo: las que cumplen algún glob
+# de --only (contra la ruta relativa, p.ej. content/blog/*) y, con
+# --changed-since, las que cambiaron. Si cambió el template entran todas las
+# páginas. Cuenta las páginas elegidas y salteadas
+class SourceSelector:
+    def __init__(self, patterns=None, changed=None, template_path=None):
+        self.patterns = [os.path.normpath(pattern) for pattern in patterns or []]
+        self.changed = changed
+        self.template_changed = (
+            changed is not None and template_path is not None and os.path.normpath(template_path) in changed
+        )
+        self.selected = 0
+        self.skipped = 0
+
+    def _matches_patterns(self, path):
+        return not self.patterns or any(fnmatch.fnmatchcase(path, pattern) for pattern in self.patterns)
+
+    def matches(self, path):
+        path = os.path.normpath(path)
+        return self._matches_patterns(path) and (self.changed is None or path in self.changed)
+
+    def selects_page(self, path):
+        if self.template_changed:
+            return self._matches_patterns(os.path.normpath(path))
+        return self.matches(path)
+
+    # Las fuentes de un manifest que entran en la selección pero ya no existen
+    # (borradas desde ref, o que cumplen --only): sus salidas sobran
+    def deleted(self, sources):
+        return [
+            source for source in sources
+            if ":" not in source and self.matches(source) and not os.path.exists(source)
+        ]
+
+    def count_page(self, path):
+        if self.selects_page(path):
+            self.selected += 1
+            return True
+        self.skipped += 1
+        return False
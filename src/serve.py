@@ -0,0 +1,320 @@
+"""Servidor estático asyncio para ./public.
+
+    python3 src/serve.py [--root public] [--host 127.0.0.1] [--port 8888]
+
+Soporta keep-alive, respuestas con sendfile, ETag/If-None-Match,
+Last-Modified/If-Modified-Since, rangos de bytes, hermanos .gz cuando el
+cliente acepta gzip y una cache en memoria para archivos chicos.
+"""
+import argparse
+import asyncio
+import email.utils
+import mimetypes
+import os
+import posixpath
+import threading
+import urllib.parse
+from collections import OrderedDict
+from stat import S_ISREG
+
+SMALL_FILE_LIMIT = 64 * 1024
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15
+MAX_HEADER_LINES = 100
+
+REASONS = {
+    200: "OK",
+    206: "Partial Content",
+    301: "Moved Permanently",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+}
+
+
+# Cache LRU de archivos chicos; la clave incluye mtime y tamaño, así un archivo
+# reescrito por un build nuevo nunca se sirve viejo
+class FileCache:
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Solo memoria: None si el archivo no está en la cache
+    def get(self, path, stat):
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def read(self, path, stat):
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        data = self.get(path, stat)
+        if data is not None:
+            return data
+        with open(path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.bytes -= len(old)
+        return data
+
+
+class Request:
+    def __init__(self, method, target, version, headers):
+        self.method = method
+        self.target = target
+        self.version = version
+        self.headers = headers
+
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class StaticServer:
+    def __init__(self, root, cache=None):
+        self.root = os.path.abspath(root)
+        self.cache = cache if cache is not None else FileCache()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:
+                    await self.send_error(writer, 400, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                keep_alive = request.keep_alive()
+                await self.respond(request, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # el servidor se está cerrando: la conexión termina sin error
+            pass
+        finally:
+            writer.close()
+
+    def resolve(self, target):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(target).path)
+        parts = [part for part in posixpath.normpath(path).split("/") if part not in ("", ".", "..")]
+        return os.path.join(self.root, *parts), path
+
+    async def respond(self, request, writer, keep_alive):
+        if request.method not in ("GET", "HEAD"):
+            await self.send_error(writer, 405, keep_alive, {"Allow": "GET, HEAD"})
+            return
+        path, url_path = self.resolve(request.target)
+        path, stat, gz_stat, is_dir = await asyncio.to_thread(locate, path, url_path.endswith("/"))
+        if is_dir and not url_path.endswith("/"):
+            # quote: el path viene decodificado y no puede llevar \r\n ni
+            # caracteres fuera de latin-1 a un header
+            await self.send_error(writer, 301, keep_alive, {"Location": urllib.parse.quote(url_path) + "/"})
+            return
+        if stat is None:
+            await self.send_error(writer, 404, keep_alive)
+            return
+
+        headers = {"Content-Type": content_type(path), "Accept-Ranges": "bytes"}
+        served_path = path
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        range_header = request.headers.get("range")
+        if gz_stat is not None:
+            headers["Vary"] = "Accept-Encoding"
+            if range_header is None and accepts_gzip(request.headers.get("accept-encoding", "")):
+                served_path = path + ".gz"
+                stat = gz_stat
+                etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-gz"'
+                headers["Content-Encoding"] = "gzip"
+        headers["ETag"] = etag
+        headers["Last-Modified"] = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+        if not_modified(request.headers, etag, stat.st_mtime):
+            await self.send_head(writer, 304, headers, None, keep_alive)
+            return
+
+        status = 200
+        offset, length = 0, stat.st_size
+        if range_header is not None:
+            byte_range = parse_range(range_header, stat.st_size)
+            if byte_range is None:
+                headers["Content-Range"] = f"bytes */{stat.st_size}"
+                await self.send_error(writer, 416, keep_alive, headers)
+                return
+            if byte_range != (0, stat.st_size):
+                status = 206
+                offset, length = byte_range
+                headers["Content-Range"] = f"bytes {offset}-{offset + length - 1}/{stat.st_size}"
+
+        await self.send_head(writer, status, headers, length, keep_alive)
+        if request.method == "HEAD" or length == 0:
+            return
+        if stat.st_size <= SMALL_FILE_LIMIT:
+            data = self.cache.get(served_path, stat)
+            if data is None:
+                data = await asyncio.to_thread(self.cache.read, served_path, stat)
+            writer.write(data[offset:offset + length] if status == 206 else data)
+            await writer.drain()
+            return
+        # archivo grande: sendfile copia del archivo al socket dentro del kernel
+        loop = asyncio.get_running_loop()
+        f = await asyncio.to_thread(open, served_path, "rb")
+        with f:
+            await loop.sendfile(writer.transport, f, offset, length)
+
+    async def send_head(self, writer, status, headers, length, keep_alive):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        lines.append(f"Date: {email.utils.formatdate(usegmt=True)}")
+        lines.append("Server: static-site")
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def send_error(self, writer, status, keep_alive, headers=None):
+        body = f"{status} {REASONS[status]}\n".encode()
+        headers = dict(headers or {})
+        headers["Content-Type"] = "text/plain; charset=utf-8"
+        await self.send_head(writer, status, headers, len(body), keep_alive)
+        writer.write(body)
+        await writer.drain()
+
+
+# ValueError: la ruta trae un byte nulo (p.ej. "/%00"), no puede existir
+def file_stat(path):
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return stat if S_ISREG(stat.st_mode) else None
+
+
+# Todo lo que toca el disco para ubicar el archivo de un request, para correr
+# en un hilo sin frenar el event loop: (ruta, stat, stat del .gz, si es un
+# directorio). stat es None si no hay archivo que servir
+def locate(path, directory_index):
+    is_dir = os.path.isdir(path)
+    if is_dir:
+        if not directory_index:
+            return path, None, None, True
+        path = os.path.join(path, "index.html")
+    stat = file_stat(path)
+    gz_stat = file_stat(path + ".gz") if stat is not None else None
+    return path, stat, gz_stat, is_dir
+
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Malformed request line")
+    method, target, version = parts
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return Request(method, target, version, headers)
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError("Too many headers")
+
+
+def content_type(path):
+    mime_type, _ = mimetypes.guess_type(path)
+    if mime_type is None:
+        return "application/octet-stream"
+    if mime_type.startswith("text/") or mime_type in ("application/javascript", "image/svg+xml"):
+        return f"{mime_type}; charset=utf-8"
+    return mime_type
+
+
+def accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def not_modified(headers, etag, mtime):
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+# "bytes=a-b" (un solo rango) -> (offset, length); None si no se puede servir
+def parse_range(header, size):
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return 0, size
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start == "":
+            length = min(int(end), size)
+            if length <= 0:
+                return None
+            return size - length, length
+        first = int(start)
+        last = int(end) if end else size - 1
+    except ValueError:
+        return 0, size
+    if first >= size or last < first:
+        return None
+    last = min(last, size - 1)
+    return first, last - first + 1
+
+
+async def serve(root, host="127.0.0.1", port=8888, ready=None):
+    server = StaticServer(root)
+    async with await asyncio.start_server(server.handle, host, port) as listener:
+        if ready is not None:
+            ready(listener)
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="public")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    args = parser.parse_args(argv)
+    print(f"Serving {args.root} on http://{args.host}:{args.port}/")
+    try:
+        asyncio.run(serve(args.root, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
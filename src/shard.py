@@ -0,0 +1,149 @@
+import hashlib
+import heapq
+import json
+import os
+import shutil
+from pathlib import Path
+
+from copystatic import copy_files_recursive
+from manifest import BuildManifest
+
+SHARD_INFO = "shard.json"
+SHARD_MANIFEST = "manifest.json"
+STRATEGIES = ("size", "hash")
+
+
+class ShardError(Exception):
+    pass
+
+
+class MergeSummary:
+    def __init__(self):
+        self.shards = 0
+        self.files = 0
+        self.bytes = 0
+
+    def __repr__(self):
+        return f"MergeSummary(shards={self.shards}, files={self.files}, bytes={self.bytes})"
+
+
+# "2/4" -> (2, 4); los shards se numeran desde 1
+def parse_shard_spec(spec):
+    index, sep, count = spec.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"Invalid shard {spec!r}, expected i/N")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {spec!r}, i must be between 1 and N")
+    return index, count
+
+
+def shard_dir(shards_root, index):
+    return os.path.join(shards_root, str(index))
+
+
+# Reparte las páginas en count shards. El plan depende solo del árbol de
+# contenido, así cada máquina calcula el mismo sin coordinarse:
+#   size: la página más grande va al shard con menos bytes (empates por número)
+#   hash: sha1 de la ruta relativa, estable entre máquinas y corridas
+# Cada shard conserva el orden original de las páginas
+def plan_shards(pages, count, dir_path_content, strategy="size"):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown shard strategy: {strategy}")
+    pages = list(pages)
+    assignment = [0] * len(pages)
+    if strategy == "hash":
+        for position, (from_path, _) in enumerate(pages):
+            relative = Path(os.path.relpath(from_path, dir_path_content)).as_posix()
+            assignment[position] = int(hashlib.sha1(relative.encode()).hexdigest(), 16) % count
+    else:
+        sizes = [os.path.getsize(from_path) for from_path, _ in pages]
+        loads = [(0, shard) for shard in range(count)]
+        for position in sorted(range(len(pages)), key=lambda position: (-sizes[position], position)):
+            load, shard = heapq.heappop(loads)
+            assignment[position] = shard
+            heapq.heappush(loads, (load + sizes[position], shard))
+    shards = [[] for _ in range(count)]
+    for position, page in enumerate(pages):
+        shards[assignment[position]].append(page)
+    return shards
+
+
+def write_shard_info(shards_root, index, count, strategy, pages):
+    with open(os.path.join(shard_dir(shards_root, index), SHARD_INFO), "w") as f:
+        json.dump({"shard": index, "count": count, "strategy": strategy, "pages": pages}, f, indent=2, sort_keys=True)
+
+
+def read_shards(shards_root):
+    shards = {}
+    count = None
+    for name in sorted(os.listdir(shards_root)) if os.path.isdir(shards_root) else []:
+        info_path = os.path.join(shards_root, name, SHARD_INFO)
+        if not os.path.isfile(info_path):
+            continue
+        with open(info_path) as f:
+            info = json.load(f)
+        if count is not None and info["count"] != count:
+            raise ShardError(f"Shard {info['shard']} is part of a {info['count']}-way build, expected {count}")
+        count = info["count"]
+        shards[info["shard"]] = os.path.join(shards_root, name)
+    if count is None:
+        raise ShardError(f"No shards found in {shards_root}")
+    missing = [str(index) for index in range(1, count + 1) if index not in shards]
+    if missing:
+        raise ShardError(f"Missing shard(s) {', '.join(missing)} of {count}")
+    return [shards[index] for index in range(1, count + 1)]
+
+
+def _shard_files(dir_path, prefix=""):
+    for entry in sorted(os.scandir(dir_path), key=lambda entry: entry.name):
+        relative = prefix + entry.name
+        if entry.is_dir():
+            yield from _shard_files(entry.path, relative + "/")
+        else:
+            yield relative
+
+
+# Junta la salida de todos los shards en dest_dir_path y sus manifests en
+# manifest. Antes de copiar nada verifica que ningún archivo de salida ni
+# fuente aparezca en más de un shard. Con replace se borra lo que había en
+# dest_dir_path, pero solo después de validar todos los shards
+def merge_shards(shards_root, dest_dir_path, manifest, replace=False):
+    shard_paths = read_shards(shards_root)
+    owners = {}
+    conflicts = []
+    for shard_path in shard_paths:
+        public = os.path.join(shard_path, "public")
+        for relative in _shard_files(public) if os.path.isdir(public) else []:
+            if relative in owners:
+                conflicts.append(f"{relative} ({owners[relative]} and {shard_path})")
+            else:
+                owners[relative] = shard_path
+
+    entries = {}
+    for shard_path in shard_paths:
+        public = os.path.join(shard_path, "public")
+        shard_manifest = BuildManifest.load(os.path.join(shard_path, SHARD_MANIFEST))
+        for source, entry in shard_manifest.entries.items():
+            if source in entries:
+                conflicts.append(f"source {source} ({shard_path})")
+                continue
+            output = os.path.join(dest_dir_path, os.path.relpath(entry["output"], public))
+            entries[source] = dict(entry, output=str(Path(output)))
+    if conflicts:
+        raise ShardError("Conflicting paths in shards: " + ", ".join(conflicts))
+
+    summary = MergeSummary()
+    if replace and os.path.exists(dest_dir_path):
+        shutil.rmtree(dest_dir_path)
+    os.makedirs(dest_dir_path, exist_ok=True)
+    for shard_path in shard_paths:
+        public = os.path.join(shard_path, "public")
+        if os.path.isdir(public):
+            copied = copy_files_recursive(public, dest_dir_path)
+            summary.files += copied.copied
+            summary.bytes += copied.bytes
+        summary.shards += 1
+    manifest.entries.update(entries)
+    manifest.seen.update(entries)
+    return summary
@@ -0,0 +1,87 @@
+import functools
+import re
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+PAGE_SLOTS = ("Title", "Content")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+# Template compilado: los segmentos literales se guardan una vez y los
+# placeholders quedan como huecos que se llenan con un solo join
+class Template:
+    def __init__(self, text, slots=None):
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append("")
+            position = match.end()
+        self.parts.append(text[position:])
+        self.names = frozenset(name for _, name in self.slots)
+
+        if slots is not None:
+            unknown = sorted(self.names - set(slots))
+            if unknown:
+                raise TemplateError(f"Unknown placeholder(s) in template: {', '.join(unknown)}")
+            missing = [name for name in slots if name not in self.names]
+            if missing:
+                raise TemplateError(f"Missing placeholder(s) in template: {', '.join(missing)}")
+
+    @classmethod
+    def from_file(cls, path, slots=PAGE_SLOTS):
+        with open(path, "r") as f:
+            return cls(f.read(), slots)
+
+    def render(self, values):
+        missing = [name for name in sorted(self.names) if name not in values]
+        if missing:
+            raise TemplateError(f"No value for placeholder(s): {', '.join(missing)}")
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            parts[index] = values[name]
+        return "".join(parts)
+
+    # Igual que render pero escribe en fp; los valores con write_html (nodos
+    # HTML) se serializan directamente en el archivo
+    def write(self, fp, values):
+        missing = [name for name in sorted(self.names) if name not in values]
+        if missing:
+            raise TemplateError(f"No value for placeholder(s): {', '.join(missing)}")
+        slots = dict(self.slots)
+        for index, part in enumerate(self.parts):
+            if index not in slots:
+                fp.write(part)
+                continue
+            value = values[slots[index]]
+            if hasattr(value, "write_html"):
+                value.write_html(fp)
+            else:
+                fp.write(value)
+
+    def __eq__(self, other):
+        if isinstance(other, Template):
+            return self.parts == other.parts and self.slots == other.slots
+        return False
+
+    def __repr__(self):
+        return f"Template({sorted(self.names)})"
+
+
+# Template compilado por texto; los Template no cambian después de creados,
+# así que se pueden compartir entre llamadas e hilos
+@functools.lru_cache(maxsize=32)
+def compile_template(text, slots=PAGE_SLOTS):
+    return Template(text, slots)
+
+
+# Lee y compila el template de path. Mientras el texto no cambie se devuelve el
+# mismo Template ya compilado, así un proceso largo como el daemon no lo
+# recompila en cada build
+def load_template(path, slots=PAGE_SLOTS):
+    with open(path, "r") as f:
+        return compile_template(f.read(), slots)
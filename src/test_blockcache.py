@@ -0,0 +1,56 @@
+import unittest
+
+from blockcache import BlockCache
+from node_delimiter import markdown_to_html_node
+
+MARKDOWN = """
+# Title
+
+> All that is gold does not glitter
+
+* one
+* **two**
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_cached_render_matches(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_pages_do_not_share_nodes(self):
+        cache = BlockCache()
+        first = markdown_to_html_node(MARKDOWN, cache)
+        second = markdown_to_html_node(MARKDOWN, cache)
+        for a, b in zip(first.children, second.children):
+            self.assertIsNot(a, b)
+
+    def test_disabled(self):
+        cache = BlockCache(enabled=False)
+        markdown_to_html_node(MARKDOWN, cache)
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_lru_eviction_by_bytes(self):
+        cache = BlockCache(max_bytes=20)
+        cache.put("a", "x" * 9)
+        cache.put("b", "y" * 9)
+        cache.get("a")
+        cache.put("c", "z" * 9)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x" * 9)
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.bytes, 20)
+
+    def test_lru_eviction_by_entries(self):
+        cache = BlockCache(max_entries=1)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("b"), "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import SyncSummary, copy_files_recursive
+
+
+class TestCopyStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "public")
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png!")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest, *parts)) as f:
+            return f.read()
+
+    def summary(self, copied=0, skipped=0, deleted=0, size=0):
+        summary = SyncSummary()
+        summary.copied, summary.skipped, summary.deleted, summary.bytes = copied, skipped, deleted, size
+        return summary
+
+    def test_copies_then_skips(self):
+        self.assertEqual(copy_files_recursive(self.source, self.dest), self.summary(copied=2, size=11))
+        self.assertEqual(self.read("images", "a.png"), "png!")
+        self.assertEqual(copy_files_recursive(self.source, self.dest), self.summary(skipped=2))
+
+    def test_changed_file_is_copied(self):
+        copy_files_recursive(self.source, self.dest)
+        self.write(os.path.join(self.source, "index.css"), "body { margin: 0 }")
+        self.assertEqual(copy_files_recursive(self.source, self.dest), self.summary(copied=1, skipped=1, size=18))
+        self.assertEqual(self.read("index.css"), "body { margin: 0 }")
+
+    def test_delete_removes_stale(self):
+        copy_files_recursive(self.source, self.dest)
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        summary = copy_files_recursive(self.source, self.dest, delete=True)
+        self.assertEqual(summary, self.summary(skipped=1, deleted=1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+
+    def test_hardlink(self):
+        copy_files_recursive(self.source, self.dest, hardlink=True)
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.source, "index.css"), os.path.join(self.dest, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
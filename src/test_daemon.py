@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import daemon
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.makedirs("content")
+        os.makedirs("static")
+        self.write("content/index.md", "# Home\n\nHello")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.socket_path = os.path.join(self.tmp.name, "build.sock")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def request(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = daemon.send(self.socket_path, " ".join(argv))
+        return code, output.getvalue()
+
+    def start(self):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            thread = threading.Thread(target=daemon.serve, args=(self.socket_path, []))
+            thread.start()
+            for _ in range(200):
+                if daemon.send(self.socket_path, "status") == 0:
+                    break
+                time.sleep(0.01)
+        return thread
+
+    def test_rebuild_changed_page(self):
+        thread = self.start()
+        try:
+            self.write("content/index.md", "# Edited\n\nHello")
+            code, output = self.request("rebuild", os.path.abspath("content/index.md"))
+            self.assertEqual(code, 0)
+            self.assertIn("ok rebuilt 1 files", output)
+            with open("public/index.html") as f:
+                self.assertEqual(f.read(), "<title>Edited</title><div><h1>Edited</h1><p>Hello</p></div>")
+        finally:
+            self.request("stop")
+            thread.join()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_failed_initial_build_keeps_serving(self):
+        self.write("content/index.md", "no title")
+        thread = self.start()
+        try:
+            self.assertEqual(self.request("status")[0], 0)
+            self.write("content/index.md", "# Fixed")
+            code, output = self.request("rebuild", "all")
+            self.assertEqual(code, 0, output)
+            self.assertTrue(os.path.exists("public/index.html"))
+        finally:
+            self.request("stop")
+            thread.join()
+
+    def test_bad_command_reports_error(self):
+        thread = self.start()
+        try:
+            code, output = self.request("rebuild")
+            self.assertEqual(code, 1)
+            self.assertTrue(output.startswith("error"))
+        finally:
+            self.request("stop")
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
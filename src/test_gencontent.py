@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import gencontent
+from concurrent.futures import ThreadPoolExecutor
+
+from gencontent import PageBuildError, build_site, collect_pages, generate_pages_recursive
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        self.write(os.path.join(self.content, "b", "index.md"), "# B\n\n* one\n* two")
+        self.write(os.path.join(self.content, "a", "index.md"), "# A\n\n**bold**")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, dest, workers):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, dest, workers=workers)
+        outputs = {}
+        for from_path, dest_path in collect_pages(self.content, dest):
+            with open(dest_path) as f:
+                outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs
+
+    def test_collect_pages_is_sorted(self):
+        pages = collect_pages(self.content, "public")
+        self.assertEqual(
+            [str(dest) for _, dest in pages],
+            ["public/a/index.html", "public/b/index.html", "public/index.html"],
+        )
+
+    def test_parallel_matches_serial(self):
+        serial = self.build(os.path.join(self.tmp.name, "serial"), 1)
+        parallel = self.build(os.path.join(self.tmp.name, "parallel"), 2)
+        self.assertEqual(serial, parallel)
+        self.assertIn("<title>A</title><div><h1>A</h1><p><b>bold</b></p></div>", serial["a/index.html"])
+
+    def test_block_cache_stats_include_workers(self):
+        cache = gencontent.default_block_cache
+        enabled = cache.enabled
+        try:
+            for enabled_in_build, expected in ((True, 6), (False, 0)):
+                cache.enabled = enabled_in_build
+                cache.clear()
+                self.build(os.path.join(self.tmp.name, f"out{enabled_in_build}"), 2)
+                self.assertEqual(cache.hits + cache.misses, expected)
+        finally:
+            cache.enabled = enabled
+            cache.clear()
+
+    def test_streaming_matches_in_memory(self):
+        self.write(os.path.join(self.content, "empty_title.md"), "---\ntitle:\n---\n# Heading\n\nbody")
+        expected = self.build(os.path.join(self.tmp.name, "memory"), 1)
+        threshold = gencontent.STREAMING_THRESHOLD
+        gencontent.STREAMING_THRESHOLD = 0
+        try:
+            streamed = self.build(os.path.join(self.tmp.name, "streamed"), 1)
+        finally:
+            gencontent.STREAMING_THRESHOLD = threshold
+        self.assertEqual(streamed, expected)
+
+    def test_title_is_escaped(self):
+        self.write(os.path.join(self.content, "index.md"), "# <script> & co\n\nhello")
+        self.write(os.path.join(self.content, "a", "index.md"), "---\ntitle: \"A\" < B\n---\n# A")
+        for workers in (1, 2):
+            outputs = self.build(os.path.join(self.tmp.name, f"out{workers}"), workers)
+            self.assertIn("<title>&lt;script&gt; &amp; co</title>", outputs["index.html"])
+            self.assertIn("<title>&quot;A&quot; &lt; B</title>", outputs["a/index.html"])
+
+    def test_failure_names_source(self):
+        self.write(os.path.join(self.content, "c.md"), "no title")
+        for workers in (1, 2):
+            with self.assertRaises(PageBuildError) as cm:
+                self.build(os.path.join(self.tmp.name, f"out{workers}"), workers)
+            self.assertEqual(cm.exception.from_path, os.path.join(self.content, "c.md"))
+
+
+class TestBuildSite(unittest.TestCase):
+    template = "<title>{{ Title }}</title>{{ Content }}"
+
+    def test_build_site_in_memory(self):
+        site = build_site({"index.md": "# Home\n\nhi", "blog/post.md": "# Post\n\n* a"}, self.template)
+        self.assertEqual(site, {
+            "blog/post.html": "<title>Post</title><div><h1>Post</h1><ul><li>a</li></ul></div>",
+            "index.html": "<title>Home</title><div><h1>Home</h1><p>hi</p></div>",
+        })
+
+    def test_build_site_names_failing_page(self):
+        with self.assertRaises(PageBuildError) as cm:
+            build_site({"ok.md": "# ok", "bad.md": "no title"}, self.template)
+        self.assertEqual(cm.exception.from_path, "bad.md")
+
+    def test_build_site_is_thread_safe(self):
+        pages = {f"p{i}.md": f"# Page {i}\n\nshared **footer**" for i in range(20)}
+        expected = build_site(pages, self.template)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: build_site(pages, self.template), range(16)))
+        for result in results:
+            self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import *
@@ -106,6 +107,24 @@ class TestHTMLNode(unittest.TestCase):
         )
 
 
+    def test_write_html_matches_to_html(self):
+        node = ParentNode(
+            "ul",
+            [
+                ParentNode("li", [LeafNode("a", "link", {"href": "/x", "title": "t"})]),
+                ParentNode("li", [LeafNode(None, "plain"), LeafNode("b", "bold")]),
+            ],
+            {"class": "nav"},
+        )
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(
+            node.to_html(),
+            '<ul class="nav"><li><a href="/x" title="t">link</a></li><li>plain<b>bold</b></li></ul>',
+        )
+
+
 
 
 
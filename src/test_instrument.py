@@ -0,0 +1,59 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from gencontent import generate_pages_recursive
+from instrument import PAGE_PHASES, Tracer
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(self.content)
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for name in ("a", "b"):
+            with open(os.path.join(self.content, f"{name}.md"), "w") as f:
+                f.write(f"# {name}\n\n* one\n* **two**")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, dest, tracer=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, dest, tracer=tracer)
+        with open(os.path.join(dest, "a.html")) as f:
+            return f.read()
+
+    def test_traced_output_matches(self):
+        tracer = Tracer(memory=True)
+        traced = self.build(os.path.join(self.tmp.name, "traced"), tracer)
+        self.assertEqual(traced, self.build(os.path.join(self.tmp.name, "plain")))
+        self.assertEqual(len(tracer.pages), 2)
+        self.assertEqual([name for name, _, _ in tracer.pages[0].phases], list(PAGE_PHASES))
+        self.assertGreater(tracer.pages[0].peak_memory, 0)
+        tracer.close()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_chrome_trace(self):
+        tracer = Tracer()
+        with tracer.phase("static copy"):
+            pass
+        self.build(os.path.join(self.tmp.name, "out"), tracer)
+        path = os.path.join(self.tmp.name, "trace.json")
+        tracer.write_chrome_trace(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(events[0]["name"], "static copy")
+        self.assertEqual(len(events), 1 + 2 * (1 + len(PAGE_PHASES)))
+        self.assertIn("Slowest 2 of 2 pages", tracer.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
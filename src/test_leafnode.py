@@ -12,7 +12,32 @@ class TestLeafNode(unittest.TestCase):
     def test_to_html_no_tag(self):
         node = LeafNode(None, "Hello, world!")
         self.assertEqual(node.to_html(), "Hello, world!")
-        
+
+    def test_text_is_escaped(self):
+        node = LeafNode("p", "a < b & c > \"d\"")
+        self.assertEqual(node.to_html(), "<p>a &lt; b &amp; c &gt; \"d\"</p>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+
+    def test_props_are_escaped(self):
+        node = LeafNode("a", "link", {"href": '/search?q="x"&y=<1>'})
+        self.assertEqual(node.to_html(), '<a href="/search?q=&quot;x&quot;&amp;y=&lt;1&gt;">link</a>')
+        # la segunda vez sale de la cache de props
+        self.assertEqual(node.to_html(), '<a href="/search?q=&quot;x&quot;&amp;y=&lt;1&gt;">link</a>')
+
+    def test_props_cache_key(self):
+        self.assertEqual(LeafNode("a", "x", {"x": 1}).to_html(), '<a x="1">x</a>')
+        self.assertEqual(LeafNode("a", "x", {"x": True}).to_html(), '<a x="True">x</a>')
+        self.assertEqual(LeafNode("a", "x", {"x": ["a", "b"]}).to_html(), '<a x="[\'a\', \'b\']">x</a>')
+
+    def test_escape_fast_path(self):
+        text = "nothing special here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+        self.assertEqual(escape_attribute("it's"), "it's")
+
+    def test_raw_html_is_not_escaped(self):
+        self.assertEqual(RawHTML("<p>a &amp; b</p>").to_html(), "<p>a &amp; b</p>")
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from linkcheck import LinkCache, build_output_index, check_links, file_links, page_links, resolve_link
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestLinks(unittest.TestCase):
+    def test_page_links(self):
+        markdown = "# T\n\n[a](/a) and ![i](/i.png)\n\n```\n[not](/code)\n```\n\n* [b](b.html)\n\nplain `[c](/c)`"
+        self.assertEqual(page_links(markdown), ["/a", "/i.png", "b.html"])
+
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link("/majesty", "/index.html"), "/majesty")
+        self.assertEqual(resolve_link("post.html#top", "/blog/index.html"), "/blog/post.html")
+        self.assertEqual(resolve_link("../images/a%20b.png", "/blog/post.html"), "/images/a b.png")
+        self.assertEqual(resolve_link("sub/", "/blog/post.html"), "/blog/sub/")
+        for external in ("https://example.com/x", "mailto:me@example.com", "//cdn.example.com/a.js", "#top"):
+            self.assertIsNone(resolve_link(external, "/index.html"))
+
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        self.content = os.path.join(self.tmp.name, "content")
+        for path in ("index.html", "blog/index.html", "blog/post.html", "images/a.png"):
+            write(os.path.join(self.public, path), "")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_output_index(self):
+        self.assertEqual(build_output_index(self.public), {
+            "/", "/index.html", "/blog", "/blog/", "/blog/index.html", "/blog/post.html", "/images/a.png",
+        })
+
+    def test_reports_broken_links_per_page(self):
+        pages = []
+        for i in range(6):
+            from_path = os.path.join(self.content, f"p{i}.md")
+            write(from_path, f"# P{i}\n\n[ok](/blog) [ok](../images/a.png) [bad](/missing{i}) [ext](http://x.org)")
+            pages.append((from_path, os.path.join(self.public, "blog", f"p{i}.html")))
+        serial = check_links(pages, self.public)
+        parallel = check_links(pages, self.public, workers=2, batch_size=2)
+        for report in (serial, parallel):
+            self.assertEqual((report.pages, report.links), (6, 24))
+            self.assertEqual(report.broken, [(from_path, f"/missing{i}") for i, (from_path, _) in enumerate(pages)])
+
+    def test_cache_parses_only_changed_sources(self):
+        pages = []
+        for i in range(3):
+            from_path = os.path.join(self.content, f"p{i}.md")
+            write(from_path, f"# P{i}\n\n[ok](/blog)")
+            pages.append((from_path, os.path.join(self.public, f"p{i}.html")))
+        cache = LinkCache.load(os.path.join(self.tmp.name, "links.json"))
+        check_links(pages, self.public, cache=cache)
+        cache.save()
+        write(pages[1][0], "# P1\n\n[bad](/gone)")
+        cache = LinkCache.load(cache.path)
+        report = check_links(pages, self.public, cache=cache)
+        self.assertEqual((report.parsed, report.reused), (1, 2))
+        self.assertEqual(report.broken, [(pages[1][0], "/gone")])
+
+    def test_file_links_matches_page_links(self):
+        markdown = "---\ntitle: T\n---\n# T\n\n[a](/a)\n\n```\n[not](/code)\n```\n\n![i](i.png)"
+        from_path = os.path.join(self.content, "page.md")
+        write(from_path, markdown)
+        self.assertEqual(file_links(from_path), page_links(markdown))
+
+
+if __name__ == "__main__":
+    unittest.main()
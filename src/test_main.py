@@ -0,0 +1,106 @@
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import unittest
+
+import main
+
+
+# Un sitio chico en un directorio temporal, ya construido una vez
+class SiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.makedirs("static")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post.md", "# Post")
+        self.args = main.parse_args([])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.manifest = main.build(self.args)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+
+class TestRebuildChanged(SiteTestCase):
+    def rebuild(self, *changed):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.rebuild_changed(list(changed), self.manifest, self.args)
+
+    def test_added_and_modified_pages(self):
+        self.write("content/index.md", "# Edited")
+        self.write("content/blog/new.md", "# New")
+        self.rebuild("content/index.md", "content/blog/new.md")
+        self.assertEqual(self.manifest.built, 2)
+        self.assertIn("<title>Edited</title>", self.read("public/index.html"))
+        self.assertIn("<title>New</title>", self.read("public/blog/new.html"))
+
+    def test_deleted_page(self):
+        os.remove("content/blog/post.md")
+        self.rebuild("content/blog/post.md")
+        self.assertFalse(os.path.exists("public/blog/post.html"))
+        self.assertNotIn("./content/blog/post.md", self.manifest.entries)
+
+    def test_deleted_page_removes_gzip(self):
+        self.args = main.parse_args(["--precompress"])
+        self.write("content/blog/post.md", "# Post\n\n" + "lorem ipsum " * 100)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.manifest = main.build(self.args)
+        self.assertTrue(os.path.exists("public/blog/post.html.gz"))
+        os.remove("content/blog/post.md")
+        self.rebuild("content/blog/post.md")
+        self.assertFalse(os.path.exists("public/blog"))
+        self.assertNotIn("gzip:public/blog/post.html", self.manifest.entries)
+
+    def test_non_markdown_files_are_ignored(self):
+        self.write("content/.index.md.swp", "binary junk")
+        self.write("content/notes.txt", "no title")
+        self.rebuild("content/.index.md.swp", "content/notes.txt")
+        self.assertEqual(self.manifest.built, 0)
+        self.assertEqual(sorted(os.listdir("public")), ["blog", "index.html"])
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def test_deleted_source_gzip_is_pruned(self):
+        self.write("content/blog/post.md", "# Post\n\n" + "lorem ipsum " * 100)
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.build(main.parse_args(["--precompress"]))
+        self.assertTrue(os.path.exists("public/blog/post.html.gz"))
+        os.remove("content/blog/post.md")
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.build(main.parse_args(["--incremental", "--precompress"]))
+        self.assertFalse(os.path.exists("public/blog"))
+
+
+class TestChangedSince(SiteTestCase):
+    def git(self, *argv):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *argv], check=True, capture_output=True)
+
+    def test_deleted_source_is_pruned(self):
+        self.git("init", "-q")
+        self.git("add", "content", "template.html")
+        self.git("commit", "-qm", "init")
+        os.remove("content/blog/post.md")
+        with contextlib.redirect_stdout(io.StringIO()):
+            manifest = main.build(main.parse_args(["--changed-since", "HEAD"]))
+        self.assertFalse(os.path.exists("public/blog/post.html"))
+        self.assertTrue(os.path.exists("public/index.html"))
+        self.assertNotIn("./content/blog/post.md", manifest.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.source = os.path.join(self.dir, "page.md")
+        self.template = os.path.join(self.dir, "template.html")
+        self.output = os.path.join(self.dir, "page.html")
+        self.manifest_path = os.path.join(self.dir, "manifest.json")
+        self.write(self.source, "# page")
+        self.write(self.template, "{{ Content }}")
+        self.write(self.output, "<h1>page</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def recorded(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.source, self.output, self.template)
+        manifest.save()
+        return BuildManifest.load(self.manifest_path)
+
+    def test_unchanged_is_fresh(self):
+        manifest = self.recorded()
+        self.assertTrue(manifest.is_fresh(self.source, self.output, self.template))
+        self.assertEqual(manifest.skipped, 1)
+
+    def test_source_change_is_stale(self):
+        manifest = self.recorded()
+        self.write(self.source, "# changed")
+        self.assertFalse(manifest.is_fresh(self.source, self.output, self.template))
+
+    def test_template_change_is_stale(self):
+        manifest = self.recorded()
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.assertFalse(manifest.is_fresh(self.source, self.output, self.template))
+
+    def test_missing_output_is_stale(self):
+        manifest = self.recorded()
+        os.remove(self.output)
+        self.assertFalse(manifest.is_fresh(self.source, self.output, self.template))
+
+    def test_prune_removes_unseen_outputs(self):
+        manifest = self.recorded()
+        self.assertEqual(manifest.prune(), [self.output])
+        self.assertFalse(os.path.exists(self.output))
+        self.assertEqual(manifest.entries, {})
+
+    def test_corrupt_manifest_starts_empty(self):
+        self.write(self.manifest_path, "{not json")
+        self.assertEqual(BuildManifest.load(self.manifest_path).entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+from gencontent import render_page_body
+from metadata import MetadataIndex, PageMetadata, body_lines, listings, page_url, scan_lines, split_front_matter
+
+PAGE = "---\ntitle: Front title\ntags: a, b\n---\n# Heading\n\ntext\n"
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        meta, body = split_front_matter(PAGE)
+        self.assertEqual(meta, {"title": "Front title", "tags": "a, b"})
+        self.assertEqual(body, "# Heading\n\ntext\n")
+        self.assertEqual(split_front_matter("# Only\n---\n"), ({}, "# Only\n---\n"))
+        self.assertEqual(split_front_matter("---\nnot closed\n# T"), ({}, "---\nnot closed\n# T"))
+        # una línea horizontal al principio no es front matter
+        self.assertEqual(split_front_matter("---\n# T\n\n---\nmore"), ({}, "---\n# T\n\n---\nmore"))
+
+    def test_body_lines_match_split(self):
+        for markdown in (PAGE, "# Only\n\ntext", "---\nnot closed\n# T\n", "---\na: b\n---", "---\n# T\n---\nx", "---\n"):
+            lines = markdown.splitlines(keepends=True)
+            self.assertEqual("".join(body_lines(lines)), split_front_matter(markdown)[1])
+
+    def test_render_uses_front_matter(self):
+        title, content = render_page_body(PAGE)
+        self.assertEqual(title, "Front title")
+        self.assertEqual(content.to_html(), "<div><h1>Heading</h1><p>text</p></div>")
+
+
+class TestScan(unittest.TestCase):
+    def test_reads_only_until_title(self):
+        read = []
+
+        def lines():
+            for line in ["intro\n", "# Title\n", "rest\n", "more\n"]:
+                read.append(line)
+                yield line
+
+        self.assertEqual(scan_lines(lines()), ("Title", {}))
+        self.assertEqual(read, ["intro\n", "# Title\n"])
+
+    def test_front_matter_title_wins(self):
+        self.assertEqual(scan_lines(PAGE.splitlines(keepends=True)),
+                         ("Front title", {"title": "Front title", "tags": "a, b"}))
+        self.assertEqual(scan_lines(["---\n", "tags: x\n", "---\n", "# Heading\n"]), ("Heading", {"tags": "x"}))
+        self.assertEqual(scan_lines(["no title\n"]), (None, {}))
+        self.assertEqual(scan_lines(["---\n", "# Heading\n", "---\n"]), ("Heading", {}))
+        self.assertEqual(scan_lines(["---\n", "title:\n", "---\n", "# Heading\n"]), ("Heading", {"title": ""}))
+
+
+class TestPageUrl(unittest.TestCase):
+    def test_directory_pages_end_with_slash(self):
+        self.assertEqual(page_url(os.path.join("public", "index.html"), "public"), "/")
+        self.assertEqual(page_url(os.path.join("public", "blog", "index.html"), "public"), "/blog/")
+        self.assertEqual(page_url(os.path.join("public", "blog", "a.html"), "public"), "/blog/a.html")
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.index_path = os.path.join(self.tmp.name, "metadata.json")
+        self.pages = []
+        for relative, text in [("index.md", "# Home"), ("blog/a.md", PAGE), ("blog/old/b.md", "# B")]:
+            from_path = os.path.join(self.content, relative)
+            os.makedirs(os.path.dirname(from_path), exist_ok=True)
+            with open(from_path, "w") as f:
+                f.write(text)
+            self.pages.append((from_path, os.path.join(self.public, relative[:-3] + ".html")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_is_cached(self):
+        index = MetadataIndex.load(self.index_path)
+        pages = index.scan(self.pages, self.public)
+        self.assertEqual([page.title for page in pages], ["Home", "Front title", "B"])
+        self.assertEqual([page.url for page in pages], ["/", "/blog/a.html", "/blog/old/b.html"])
+        index.save()
+
+        with open(self.pages[2][0], "w") as f:
+            f.write("# B, edited")
+        os.utime(self.pages[2][0], ns=(0, 0))
+        index = MetadataIndex.load(self.index_path)
+        self.assertEqual(index.scan(self.pages, self.public)[2].title, "B, edited")
+        self.assertEqual((index.scanned, index.reused), (1, 2))
+
+    def test_listings(self):
+        pages = MetadataIndex(self.index_path).scan(self.pages, self.public)
+        self.assertEqual(listings(pages, self.public), {
+            os.path.join(self.public, "blog", "index.html"):
+                ("blog", [("Front title", "/blog/a.html"), ("old", "/blog/old/")]),
+            os.path.join(self.public, "blog", "old", "index.html"):
+                ("old", [("B", "/blog/old/b.html")]),
+        })
+
+    def test_page_metadata_round_trip(self):
+        page = PageMetadata("content/a.md", "public/a.html", "/a.html", "A", {"tags": "x"})
+        self.assertEqual(PageMetadata.from_json("content/a.md", page.to_json()), page)
+
+
+if __name__ == "__main__":
+    unittest.main()
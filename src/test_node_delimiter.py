@@ -1,6 +1,8 @@
+import io
 import unittest
 from node_delimiter import (split_nodes_delimiter, extract_markdown_images, extract_markdown_links,
- split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks,block_to_block_type,markdown_to_html_node)
+ split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks,block_to_block_type,markdown_to_html_node,
+ iter_markdown_blocks, StreamingMarkdown, markdown_to_typed_blocks)
 from textnode import TextNode, TextType
 
 class TestInlineMarkdown(unittest.TestCase):
@@ -64,6 +66,24 @@ class TestInlineMarkdown(unittest.TestCase):
         )
 
 
+    def test_text_to_textnodes_unclosed(self):
+        for text in ["a **bold", "an *italic", "some `code"]:
+            with self.assertRaisesRegex(ValueError, "not closed"):
+                text_to_textnodes(text)
+
+    def test_text_to_textnodes_code_keeps_stars(self):
+        self.assertListEqual(
+            [TextNode("run ", TextType.TEXT), TextNode("a*b", TextType.CODE)],
+            text_to_textnodes("run `a*b`"),
+        )
+
+    def test_formatting_inside_link_text(self):
+        html = markdown_to_html_node("see [the **bold** *docs*](/docs) now").to_html()
+        self.assertEqual(
+            html,
+            '<div><p>see <a href="/docs">the <b>bold</b> <i>docs</i></a> now</p></div>',
+        )
+
 
 class TestExtractwithRegex(unittest.TestCase):
     def test_image_regex(self):
@@ -143,6 +163,19 @@ Third block"""
         self.assertEqual(markdown_to_blocks(markdown), ["First block","Second block","Third block"])
 
 
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        markdown = "  First block\n\n \t \nSecond block  \n  more text\n\n\n\nThird block   \n"
+        self.assertEqual(
+            list(iter_markdown_blocks(io.StringIO(markdown))),
+            markdown_to_blocks(markdown),
+        )
+
+    def test_streaming_matches_markdown_to_html_node(self):
+        markdown = "# Title\n\n> a quote\n\n* one\n* **two**\n\nplain *text*\n"
+        buffer = io.StringIO()
+        StreamingMarkdown(io.StringIO(markdown)).write_html(buffer)
+        self.assertEqual(buffer.getvalue(), markdown_to_html_node(markdown).to_html())
+
 
 
 
@@ -168,6 +201,47 @@ class TestBlockTypes(unittest.TestCase):
         self.assertEqual(block_to_block_type(block),"heading")
 
 
+class TestTypedBlocks(unittest.TestCase):
+    def test_matches_split_and_classify(self):
+        markdown = """# Title
+
+> quote one
+>> quote two
+
+* a
+- b
+
+1. one
+2. two
+
+1. one
+3. three
+
+plain *text*
+more
+
+```
+code
+```"""
+        self.assertEqual(
+            markdown_to_typed_blocks(markdown),
+            [(block, block_to_block_type(block)) for block in markdown_to_blocks(markdown)],
+        )
+
+    def test_fenced_code_keeps_blank_lines(self):
+        markdown = "```\nfirst\n\n# not a heading\n```\n\nafter"
+        self.assertEqual(
+            markdown_to_typed_blocks(markdown),
+            [("```\nfirst\n\n# not a heading\n```", "code"), ("after", "paragraph")],
+        )
+
+    def test_unclosed_fence_falls_back(self):
+        markdown = "```\nopen\n\nstill"
+        self.assertEqual(
+            markdown_to_typed_blocks(markdown),
+            [("```\nopen", "paragraph"), ("still", "paragraph")],
+        )
+
 
 class TestBlocktoHTML(unittest.TestCase):
     def test_headings(self):
@@ -227,6 +301,21 @@ This is another paragraph with *italic* text and `code` here
         )
 
 
+    def test_special_characters_are_escaped(self):
+        md = """Use `a < b` & [this "link"](/q?a=1&b="2")
+
+```
+if x > 0 && y:
+```
+"""
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>Use <code>a &lt; b</code> &amp; <a href="/q?a=1&amp;b=&quot;2&quot;">this "link"</a></p>'
+            "<pre><code>if x &gt; 0 &amp;&amp; y:\n</code></pre></div>",
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
 
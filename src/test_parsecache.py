@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+import parsecache
+from gencontent import write_page
+from parsecache import ParseCache
+from template import Template
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def entry_path(self, markdown):
+        return self.cache._entry_path(self.cache.key(markdown))
+
+    def test_roundtrip(self):
+        self.assertIsNone(self.cache.get("# a"))
+        self.cache.put("# a", "a", "<div><h1>a</h1></div>")
+        self.assertEqual(self.cache.get("# a"), ("a", "<div><h1>a</h1></div>"))
+
+    def test_parser_version_is_part_of_key(self):
+        key = self.cache.key("# a")
+        old_version = parsecache.PARSER_VERSION
+        parsecache.PARSER_VERSION = old_version + "-next"
+        try:
+            self.assertNotEqual(self.cache.key("# a"), key)
+        finally:
+            parsecache.PARSER_VERSION = old_version
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("# a", "a", "<h1>a</h1>")
+        with open(self.entry_path("# a"), "wb") as f:
+            f.write(b"not zlib")
+        self.assertIsNone(self.cache.get("# a"))
+        self.assertFalse(os.path.exists(self.entry_path("# a")))
+
+    def test_trim_removes_least_recently_used(self):
+        self.cache.put("# old", "old", "x" * 1000)
+        self.cache.put("# new", "new", "y" * 1000)
+        os.utime(self.entry_path("# old"), ns=(0, 0))
+        self.cache.max_bytes = os.path.getsize(self.entry_path("# new"))
+        self.assertEqual(self.cache.trim(), 1)
+        self.assertIsNone(self.cache.get("# old"))
+        self.assertIsNotNone(self.cache.get("# new"))
+
+    def test_write_page_uses_cached_body(self):
+        source = os.path.join(self.tmp.name, "page.md")
+        dest = os.path.join(self.tmp.name, "page.html")
+        with open(source, "w") as f:
+            f.write("# Real")
+        template = Template("{{ Title }}|{{ Content }}")
+        write_page(source, template, dest, self.cache)
+        with open(dest) as f:
+            self.assertEqual(f.read(), "Real|<div><h1>Real</h1></div>")
+        self.cache.put("# Real", "Cached", "<p>cached</p>")
+        write_page(source, template, dest, self.cache)
+        with open(dest) as f:
+            self.assertEqual(f.read(), "Cached|<p>cached</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+import gencontent
+from gencontent import PageBuildError, generate_pages_recursive, iter_pages
+from manifest import BuildManifest
+from pipeline import generate_pages_pipelined
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(40):
+            self.write(os.path.join(self.content, f"d{i % 3}", f"p{i:02}.md"), f"# Page {i}\n\n*text* {i}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read_tree(self, dest):
+        outputs = {}
+        for _, dest_path in iter_pages(self.content, dest):
+            with open(dest_path) as f:
+                outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs
+
+    def pipelined(self, dest, manifest=None, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            stats = generate_pages_pipelined(iter_pages(self.content, dest), self.template, manifest, **kwargs)
+        return stats, output.getvalue()
+
+    def test_matches_serial_build(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, serial)
+        for workers in (1, 2):
+            dest = os.path.join(self.tmp.name, f"pipeline{workers}")
+            stats, output = self.pipelined(dest, workers=workers)
+            self.assertEqual(self.read_tree(dest), self.read_tree(serial))
+            self.assertEqual(stats.pages, 40)
+            # el reporte sale en el orden de las páginas, no en el de llegada
+            reported = [line.split(" -> ")[1] for line in output.splitlines()]
+            self.assertEqual(reported, [str(dest_path) for _, dest_path in iter_pages(self.content, dest)])
+
+    def test_in_flight_pages_are_bounded(self):
+        stats, _ = self.pipelined(os.path.join(self.tmp.name, "out"), queue_size=1, read_threads=1, write_threads=1)
+        self.assertEqual(stats.capacity, 6)
+        self.assertLessEqual(stats.peak_in_flight, stats.capacity)
+        self.assertEqual([stage.items for stage in stats.stages], [40, 40, 40])
+
+    def test_streaming_pages(self):
+        threshold = gencontent.STREAMING_THRESHOLD
+        gencontent.STREAMING_THRESHOLD = 0
+        try:
+            streamed = os.path.join(self.tmp.name, "streamed")
+            self.pipelined(streamed)
+        finally:
+            gencontent.STREAMING_THRESHOLD = threshold
+        memory = os.path.join(self.tmp.name, "memory")
+        self.pipelined(memory)
+        self.assertEqual(self.read_tree(streamed), self.read_tree(memory))
+
+    def test_manifest_skips_fresh_pages(self):
+        dest = os.path.join(self.tmp.name, "out")
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        self.pipelined(dest, manifest)
+        self.assertEqual(manifest.built, 40)
+        manifest.reset()
+        self.write(os.path.join(self.content, "d0", "p00.md"), "# Edited")
+        stats, _ = self.pipelined(dest, manifest)
+        self.assertEqual((stats.pages, manifest.built, manifest.skipped), (1, 1, 39))
+
+    def test_failures_are_reported_in_order(self):
+        self.write(os.path.join(self.content, "d1", "bad.md"), "no title")
+        self.write(os.path.join(self.content, "d2", "bad.md"), "no title")
+        with self.assertRaises(PageBuildError) as cm:
+            self.pipelined(os.path.join(self.tmp.name, "out"), workers=2)
+        self.assertEqual(cm.exception.from_path, os.path.join(self.content, "d1", "bad.md"))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "out", "d2", "p38.html")))
+
+    def test_consumer_failure_does_not_hang(self):
+        class FailingManifest(BuildManifest):
+            def record(self, *args, **kwargs):
+                raise OSError("disk full")
+
+        manifest = FailingManifest(os.path.join(self.tmp.name, "manifest.json"))
+        result = []
+        thread = threading.Thread(target=lambda: result.append(self.capture_error(manifest)), daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertIsInstance(result[0], OSError)
+
+    def capture_error(self, manifest):
+        try:
+            self.pipelined(os.path.join(self.tmp.name, "out"), manifest, queue_size=1, read_threads=1, write_threads=1)
+        except OSError as e:
+            return e
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+from postbuild import asset_urls, fingerprint_assets, gzip_bytes, precompress, rewrite_references
+
+
+class TestPostBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        self.page = os.path.join(self.public, "index.html")
+        self.write(self.page, '<link href="/index.css" rel="stylesheet">' + "<p>hello</p>" * 50)
+        self.manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_gzip_roundtrip(self):
+        self.assertEqual(gzip.decompress(gzip_bytes(b"abc" * 100)), b"abc" * 100)
+
+    def test_precompress_and_reuse(self):
+        summary = precompress(self.public, self.manifest)
+        self.assertEqual((summary.compressed, summary.reused), (1, 0))
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), self.read(self.page))
+        self.manifest.reset()
+        summary = precompress(self.public, self.manifest)
+        self.assertEqual((summary.compressed, summary.reused), (0, 1))
+
+    def test_precompress_skips_incompressible(self):
+        tiny = os.path.join(self.public, "tiny.css")
+        self.write(tiny, "a{}")
+        summary = precompress(self.public)
+        self.assertEqual(summary.skipped, 1)
+        self.assertFalse(os.path.exists(tiny + ".gz"))
+
+    def test_fingerprint_and_rewrite(self):
+        mapping = fingerprint_assets(self.static, self.public, self.manifest)
+        fingerprinted = mapping["/index.css"]
+        self.assertRegex(fingerprinted, r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertTrue(os.path.exists(os.path.join(self.public, fingerprinted[1:])))
+        self.assertEqual(rewrite_references(self.public, mapping), 1)
+        self.assertIn(f'href="{fingerprinted}"', self.read(self.page))
+
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 1px }")
+        self.manifest.reset()
+        new_mapping = fingerprint_assets(self.static, self.public, self.manifest)
+        rewrite_references(self.public, new_mapping)
+        self.assertIn(f'href="{new_mapping["/index.css"]}"', self.read(self.page))
+        self.assertFalse(os.path.exists(os.path.join(self.public, fingerprinted[1:])))
+
+        rewrite_references(self.public, asset_urls(self.static))
+        self.assertIn('href="/index.css"', self.read(self.page))
+
+    def test_rewrite_only_given_pages(self):
+        other = os.path.join(self.public, "other.html")
+        self.write(other, '<link href="/index.css">')
+        mapping = fingerprint_assets(self.static, self.public)
+        self.assertEqual(rewrite_references(self.public, mapping, [other]), 1)
+        self.assertIn('href="/index.css"', self.read(self.page))
+        self.assertNotIn('href="/index.css"', self.read(other))
+
+    def test_rewrite_does_not_touch_hardlinked_source(self):
+        source = os.path.join(self.static, "page.html")
+        self.write(source, '<link href="/index.css">' * 20)
+        linked = os.path.join(self.public, "page.html")
+        os.link(source, linked)
+        rewrite_references(self.public, fingerprint_assets(self.static, self.public))
+        precompress(self.public)
+        self.assertNotIn('href="/index.css"', self.read(linked))
+        self.assertEqual(self.read(source), '<link href="/index.css">' * 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+import gencontent
+from searchindex import SearchIndex, decode_index, decode_varint, encode_index, encode_varint, file_terms, page_terms, search
+
+
+class TestEncoding(unittest.TestCase):
+    def test_varint_round_trip(self):
+        for number in (0, 1, 127, 128, 300, 2 ** 35):
+            out = bytearray()
+            encode_varint(number, out)
+            self.assertEqual(decode_varint(out, 0), (number, len(out)))
+
+    def test_index_round_trip(self):
+        pages = [("/", "Home"), ("/a.html", "A"), ("/b.html", None)]
+        postings = {"hello": [0, 2], "world": [1], "ñandú": [0, 1, 2]}
+        data = encode_index(pages, postings)
+        self.assertEqual(decode_index(data), ([("/", "Home"), ("/a.html", "A"), ("/b.html", "")], postings))
+        # las listas van como diferencias: [0, 1, 2] ocupa 3 bytes
+        self.assertIn(b"\x03\x00\x01\x01", data)
+
+    def test_page_terms(self):
+        markdown = "---\ntitle: x\n---\n# Hello *World*\n\nSee [the Docs](/docs) ![A cat](/c.png) a\n\n```\nprint(x)\n```"
+        self.assertEqual(page_terms(markdown), ["cat", "docs", "hello", "print", "see", "the", "world"])
+
+    def test_file_terms_streams_large_pages(self):
+        markdown = "---\ntitle: Front\n---\n# Hello *World*\n\n---\n\n* a [link](/x)\n\n```\nprint(x)\n```\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            from_path = os.path.join(tmp, "page.md")
+            with open(from_path, "w") as f:
+                f.write(markdown)
+            threshold = gencontent.STREAMING_THRESHOLD
+            gencontent.STREAMING_THRESHOLD = 0
+            try:
+                streamed = file_terms(from_path)
+            finally:
+                gencontent.STREAMING_THRESHOLD = threshold
+            self.assertEqual(streamed, ("Front", page_terms(markdown)))
+            self.assertEqual(file_terms(from_path), streamed)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(self.public)
+        self.pages = []
+        for name, text in [("index", "# Home\n\nwelcome hobbits"), ("b", "# B\n\nhobbits and elves"), ("a", "# A\n\nelves")]:
+            from_path = os.path.join(self.tmp.name, f"{name}.md")
+            with open(from_path, "w") as f:
+                f.write(text)
+            self.pages.append((from_path, os.path.join(self.public, f"{name}.html")))
+        self.cache_path = os.path.join(self.tmp.name, "search.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(os.path.join(self.public, "search.bin"), "rb") as f:
+            return decode_index(f.read())
+
+    def test_build_and_search(self):
+        index = SearchIndex(self.cache_path)
+        index.update(self.pages, self.public)
+        index.write(os.path.join(self.public, "search.bin"))
+        pages, postings = self.read()
+        self.assertEqual(pages, [("/", "Home"), ("/a.html", "A"), ("/b.html", "B")])
+        self.assertEqual(postings["elves"], [1, 2])
+        self.assertEqual(search(pages, postings, "Hobbits ELVES"), [("/b.html", "B")])
+
+    def test_incremental_update(self):
+        index = SearchIndex(self.cache_path)
+        index.update(self.pages, self.public)
+        index.save()
+        with open(self.pages[2][0], "w") as f:
+            f.write("# A\n\ndwarves")
+        index = SearchIndex.load(self.cache_path)
+        index.update(self.pages[1:], self.public)
+        self.assertEqual((index.tokenized, index.reused), (1, 1))
+        index.write(os.path.join(self.public, "search.bin"))
+        pages, postings = self.read()
+        self.assertEqual(pages, [("/a.html", "A"), ("/b.html", "B")])
+        self.assertEqual(postings["dwarves"], [0])
+        self.assertNotIn("welcome", postings)
+
+
+if __name__ == "__main__":
+    unittest.main()
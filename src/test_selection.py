@@ -0,0 +1,86 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from copystatic import copy_files_recursive
+from gencontent import collect_pages
+from selection import SelectionError, SourceSelector, git_changed_files
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestSourceSelector(unittest.TestCase):
+    def test_only_globs(self):
+        selector = SourceSelector(["content/blog/*", "./static/*.css"])
+        self.assertTrue(selector.matches("./content/blog/2024/post.md"))
+        self.assertTrue(selector.matches("static/index.css"))
+        self.assertFalse(selector.matches("content/index.md"))
+
+    def test_changed_and_globs(self):
+        selector = SourceSelector(["content/blog/*"], {"content/blog/a.md", "content/index.md"})
+        self.assertEqual([selector.count_page(path) for path in ("content/blog/a.md", "content/blog/b.md", "content/index.md")],
+                         [True, False, False])
+        self.assertEqual((selector.selected, selector.skipped), (1, 2))
+
+    def test_template_change_selects_every_page(self):
+        selector = SourceSelector(None, {"template.html"}, "./template.html")
+        self.assertTrue(selector.selects_page("./content/index.md"))
+        self.assertFalse(selector.matches("./static/index.css"))
+
+
+class TestSelectiveSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for path in ("content/index.md", "content/blog/a.md", "static/a.css", "static/img/b.png"):
+            write(os.path.join(self.root, path), path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_limits_pages_and_static(self):
+        selector = SourceSelector([os.path.join(self.root, "*", "blog", "*"), os.path.join(self.root, "static", "*.css")])
+        pages = collect_pages(os.path.join(self.root, "content"), "public", selector.matches)
+        self.assertEqual([str(dest) for _, dest in pages], ["public/blog/a.html"])
+        public = os.path.join(self.root, "public")
+        summary = copy_files_recursive(os.path.join(self.root, "static"), public, only=selector.matches)
+        self.assertEqual(summary.copied, 1)
+        self.assertTrue(os.path.exists(os.path.join(public, "a.css")))
+        self.assertFalse(os.path.exists(os.path.join(public, "img", "b.png")))
+
+    def test_deleted_sources(self):
+        gone, index, old = (os.path.join(self.root, "content", name) for name in ("gone.md", "index.md", "old.md"))
+        selector = SourceSelector(None, {gone, index})
+        self.assertEqual(selector.deleted([gone, index, old, f"gzip:{gone}"]), [gone])
+
+    def git(self, *argv):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *argv],
+                       cwd=self.root, check=True, capture_output=True)
+
+    def test_git_changed_files(self):
+        self.git("init", "-q")
+        self.git("add", "-A")
+        self.git("commit", "-qm", "init")
+        write(os.path.join(self.root, "content", "index.md"), "edited")
+        write(os.path.join(self.root, "content", "new.md"), "new")
+        self.git("mv", "content/blog/a.md", "content/blog/moved.md")
+        os.remove(os.path.join(self.root, "static", "a.css"))
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            self.assertEqual(git_changed_files("HEAD"), {
+                "content/index.md", "content/new.md", "content/blog/a.md", "content/blog/moved.md", "static/a.css",
+            })
+            with self.assertRaises(SelectionError):
+                git_changed_files("no-such-ref")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    unittest.main()
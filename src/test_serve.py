@@ -0,0 +1,105 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from postbuild import gzip_bytes
+from serve import StaticServer, accepts_gzip, not_modified, parse_range
+
+
+class TestServeHelpers(unittest.TestCase):
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=0-9", 100), (0, 10))
+        self.assertEqual(parse_range("bytes=90-", 100), (90, 10))
+        self.assertEqual(parse_range("bytes=-5", 100), (95, 5))
+        self.assertEqual(parse_range("bytes=50-500", 100), (50, 50))
+        self.assertIsNone(parse_range("bytes=100-", 100))
+        self.assertEqual(parse_range("bytes=0-1,5-6", 100), (0, 100))
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("*"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("br"))
+
+    def test_not_modified(self):
+        self.assertTrue(not_modified({"if-none-match": '"a", "b"'}, '"b"', 0))
+        self.assertFalse(not_modified({"if-none-match": '"a"'}, '"b"', 0))
+        self.assertTrue(not_modified({"if-modified-since": "Thu, 01 Jan 1970 00:01:40 GMT"}, '"b"', 100.5))
+        self.assertFalse(not_modified({"if-modified-since": "Thu, 01 Jan 1970 00:01:40 GMT"}, '"b"', 101))
+
+
+class TestStaticServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.body = b"<p>hello</p>" * 100
+        with open(os.path.join(self.tmp.name, "index.html"), "wb") as f:
+            f.write(self.body)
+        with open(os.path.join(self.tmp.name, "index.html.gz"), "wb") as f:
+            f.write(gzip_bytes(self.body))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    # dos requests por la misma conexión keep-alive
+    async def exchange(self, *requests):
+        server = await asyncio.start_server(StaticServer(self.tmp.name).handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for request in requests:
+            writer.write(request.encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode().split("\r\n")
+            headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+            body = await reader.readexactly(int(headers.get("Content-Length", 0)))
+            responses.append((lines[0], headers, body))
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+        return responses
+
+    def test_keep_alive_gzip_and_etag(self):
+        first, second = asyncio.run(self.exchange(
+            "GET / HTTP/1.1\r\nHost: x\r\n\r\n",
+            "GET /index.html HTTP/1.1\r\nHost: x\r\nAccept-Encoding: gzip\r\n\r\n",
+        ))
+        self.assertEqual(first[0], "HTTP/1.1 200 OK")
+        self.assertEqual(first[2], self.body)
+        self.assertEqual(second[1]["Content-Encoding"], "gzip")
+        self.assertNotEqual(first[1]["ETag"], second[1]["ETag"])
+
+        (not_modified_response,) = asyncio.run(self.exchange(
+            f"GET / HTTP/1.1\r\nHost: x\r\nIf-None-Match: {first[1]['ETag']}\r\n\r\n",
+        ))
+        self.assertEqual(not_modified_response[0], "HTTP/1.1 304 Not Modified")
+
+    def test_range_and_not_found(self):
+        partial, missing = asyncio.run(self.exchange(
+            "GET /index.html HTTP/1.1\r\nHost: x\r\nRange: bytes=3-5\r\n\r\n",
+            "GET /../secret HTTP/1.1\r\nHost: x\r\n\r\n",
+        ))
+        self.assertEqual(partial[0], "HTTP/1.1 206 Partial Content")
+        self.assertEqual(partial[2], self.body[3:6])
+        self.assertEqual(missing[0], "HTTP/1.1 404 Not Found")
+
+    def test_null_byte_is_not_found(self):
+        (response,) = asyncio.run(self.exchange("GET /%00 HTTP/1.1\r\nHost: x\r\n\r\n"))
+        self.assertEqual(response[0], "HTTP/1.1 404 Not Found")
+
+    def test_directory_redirect_is_quoted(self):
+        for name in ("blog\r\nSet-Cookie: a=b", "日本"):
+            os.mkdir(os.path.join(self.tmp.name, name))
+        injected, unicode = asyncio.run(self.exchange(
+            "GET /blog%0d%0aSet-Cookie:%20a=b HTTP/1.1\r\nHost: x\r\n\r\n",
+            "GET /%E6%97%A5%E6%9C%AC HTTP/1.1\r\nHost: x\r\n\r\n",
+        ))
+        self.assertEqual(injected[0], "HTTP/1.1 301 Moved Permanently")
+        self.assertEqual(injected[1]["Location"], "/blog%0D%0ASet-Cookie%3A%20a%3Db/")
+        self.assertNotIn("Set-Cookie", injected[1])
+        self.assertEqual(unicode[1]["Location"], "/%E6%97%A5%E6%9C%AC/")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+from shard import ShardError, merge_shards, parse_shard_spec, plan_shards
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestPlan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pages = []
+        for i, size in enumerate([50, 10, 40, 30, 20, 5]):
+            from_path = os.path.join(self.tmp.name, f"p{i}.md")
+            write(from_path, "x" * size)
+            self.pages.append((from_path, f"p{i}.html"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_shard_spec(self):
+        self.assertEqual(parse_shard_spec("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard_spec(spec)
+
+    def test_size_balanced(self):
+        shards = plan_shards(self.pages, 2, self.tmp.name, "size")
+        self.assertEqual([[dest for _, dest in shard] for shard in shards],
+                         [["p0.html", "p1.html", "p4.html"], ["p2.html", "p3.html", "p5.html"]])
+
+    def test_every_page_once_in_order(self):
+        for strategy in ("size", "hash"):
+            shards = plan_shards(self.pages, 3, self.tmp.name, strategy)
+            self.assertEqual(sorted(page for shard in shards for page in shard), sorted(self.pages))
+            for shard in shards:
+                self.assertEqual(shard, sorted(shard, key=self.pages.index))
+            self.assertEqual(shards, plan_shards(self.pages, 3, self.tmp.name, strategy))
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = self.tmp.name
+        write(os.path.join(self.site, "template.html"),
+              '<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+        write(os.path.join(self.site, "static", "index.css"), "body { color: red; }\n" * 50)
+        for i in range(7):
+            write(os.path.join(self.site, "content", f"s{i % 2}", f"p{i}.md"), f"# Page {i}\n\n" + "text " * (i * 40))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *argv):
+        return subprocess.Popen([sys.executable, MAIN, *argv], cwd=self.site, stdout=subprocess.DEVNULL)
+
+    def test_merge_is_byte_identical(self):
+        self.assertEqual(self.run_main("--precompress", "--fingerprint").wait(), 0)
+        single = os.path.join(self.site, "single")
+        os.rename(os.path.join(self.site, "public"), single)
+
+        shards = [self.run_main("--shard", f"{i}/3") for i in (1, 2, 3)]
+        self.assertEqual([process.wait() for process in shards], [0, 0, 0])
+        self.assertEqual(self.run_main("--merge", "--precompress", "--fingerprint").wait(), 0)
+
+        comparison = filecmp.dircmp(single, os.path.join(self.site, "public"))
+        self.assertEqual(self.differences(comparison), [])
+
+    def differences(self, comparison):
+        (_, mismatch, errors) = filecmp.cmpfiles(comparison.left, comparison.right, comparison.common_files, shallow=False)
+        found = comparison.left_only + comparison.right_only + mismatch + errors
+        for sub in comparison.subdirs.values():
+            found += self.differences(sub)
+        return found
+
+    def test_conflicting_outputs(self):
+        shards = os.path.join(self.site, "shards")
+        for index in (1, 2):
+            write(os.path.join(shards, str(index), "shard.json"), f'{{"shard": {index}, "count": 2}}')
+            write(os.path.join(shards, str(index), "public", "index.html"), "x")
+        manifest = BuildManifest(os.path.join(self.site, "manifest.json"))
+        with self.assertRaises(ShardError) as cm:
+            merge_shards(shards, os.path.join(self.site, "public"), manifest)
+        self.assertIn("index.html", str(cm.exception))
+        self.assertFalse(os.path.exists(os.path.join(self.site, "public", "index.html")))
+
+    def test_failed_merge_keeps_public(self):
+        write(os.path.join(self.site, "public", "index.html"), "previous build")
+        write(os.path.join(self.site, "shards", "2", "shard.json"), '{"shard": 2, "count": 2}')
+        merge = subprocess.run([sys.executable, MAIN, "--merge"], cwd=self.site, capture_output=True, text=True)
+        self.assertEqual(merge.returncode, 1)
+        self.assertEqual(merge.stderr, "error: Missing shard(s) 1 of 2\n")
+        with open(os.path.join(self.site, "public", "index.html")) as f:
+            self.assertEqual(f.read(), "previous build")
+
+    def test_missing_shard(self):
+        shards = os.path.join(self.site, "shards")
+        write(os.path.join(shards, "2", "shard.json"), '{"shard": 2, "count": 2}')
+        with self.assertRaises(ShardError):
+            merge_shards(shards, os.path.join(self.site, "public"), BuildManifest("unused.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
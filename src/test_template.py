@@ -0,0 +1,60 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+
+from template import Template, TemplateError, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title> {{ Title }} </title><article>{{ Content }}</article>")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<title> Home </title><article><p>hi</p></article>",
+        )
+
+    def test_any_placeholder_and_repeats(self):
+        template = Template("{{Nav}}|{{ Title }}|{{ Nav }}")
+        self.assertEqual(template.names, frozenset({"Nav", "Title"}))
+        self.assertEqual(template.render({"Nav": "n", "Title": "t"}), "n|t|n")
+
+    def test_values_are_not_rescanned(self):
+        template = Template("{{ Content }}")
+        self.assertEqual(template.render({"Content": "{{ Title }}"}), "{{ Title }}")
+
+    def test_write_streams_nodes(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        node = ParentNode("div", [LeafNode("p", "hi")])
+        buffer = io.StringIO()
+        template.write(buffer, {"Title": "Home", "Content": node})
+        self.assertEqual(buffer.getvalue(), "<title>Home</title><div><p>hi</p></div>")
+
+    def test_unknown_placeholder(self):
+        with self.assertRaisesRegex(TemplateError, "Unknown placeholder.*Footer"):
+            Template("{{ Title }}{{ Content }}{{ Footer }}", ("Title", "Content"))
+
+    def test_missing_placeholder(self):
+        with self.assertRaisesRegex(TemplateError, "Missing placeholder.*Content"):
+            Template("<title>{{ Title }}</title>", ("Title", "Content"))
+
+    def test_missing_value(self):
+        with self.assertRaisesRegex(TemplateError, "Title"):
+            Template("{{ Title }}").render({})
+
+    def test_load_template_reuses_compiled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>{{ Content }}")
+            self.assertEqual(load_template(path).render({"Title": "t", "Content": ""}), "<h1>t</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
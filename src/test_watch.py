@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from watch import changed_paths, snapshot, watch
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.page = os.path.join(self.tmp.name, "content", "index.md")
+        os.makedirs(os.path.dirname(self.page))
+        self.write(self.page, "# Home")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_changed_paths(self):
+        before = snapshot([self.tmp.name])
+        self.write(self.page, "# Home, edited")
+        new_page = os.path.join(self.tmp.name, "content", "new.md")
+        self.write(new_page, "# New")
+        self.assertEqual(
+            changed_paths(before, snapshot([self.tmp.name])),
+            {os.path.normpath(self.page), os.path.normpath(new_page)},
+        )
+
+    def test_deleted_path(self):
+        before = snapshot([self.tmp.name])
+        os.remove(self.page)
+        self.assertEqual(changed_paths(before, snapshot([self.tmp.name])), {os.path.normpath(self.page)})
+
+    def test_watch_reports_batch(self):
+        calls = []
+
+        def should_stop():
+            if not calls and len(polls) == 1:
+                self.write(self.page, "# Home, edited")
+            polls.append(None)
+            return bool(calls)
+
+        polls = []
+        watch([self.tmp.name], calls.append, interval=0, debounce=0, should_stop=should_stop)
+        self.assertEqual(calls, [[os.path.normpath(self.page)]])
+
+
+if __name__ == "__main__":
+    unittest.main()
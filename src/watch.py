@@ -0,0 +1,52 @@
+import os
+import time
+
+
+# mtime y tamaño de cada archivo bajo las rutas observadas
+def snapshot(paths):
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            _stat_into(state, path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                _stat_into(state, os.path.join(dirpath, filename))
+    return state
+
+
+def _stat_into(state, path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return
+    state[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+
+
+def changed_paths(old, new):
+    changed = {path for path, stamp in new.items() if old.get(path) != stamp}
+    changed.update(path for path in old if path not in new)
+    return changed
+
+
+# Llama a on_change con las rutas cambiadas; una ráfaga de cambios (p.ej. un
+# editor que guarda varios archivos) se agrupa esperando a que el árbol quede
+# quieto durante `debounce` segundos
+def watch(paths, on_change, interval=0.05, debounce=0.03, should_stop=None):
+    state = snapshot(paths)
+    while should_stop is None or not should_stop():
+        time.sleep(interval)
+        current = snapshot(paths)
+        changed = changed_paths(state, current)
+        if not changed:
+            continue
+        while True:
+            time.sleep(debounce)
+            latest = snapshot(paths)
+            more = changed_paths(current, latest)
+            if not more:
+                break
+            changed |= more
+            current = latest
+        state = current
+        on_change(sorted(changed))